@@ -0,0 +1,178 @@
+import importlib.util
+import os
+from typing import NamedTuple
+
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+# numpy is optional (the endpoints answer 503 without it) and imported on
+# first use so it does not add to worker start-up time
+np = None
+
+from cache import TTLCache
+from models import Grade
+import catalog
+import shards
+
+# ✅ Cohort statistics per term
+#
+# A term's grades are loaded once as column arrays and every statistic is
+# computed with vectorized NumPy operations. Results are cached per term
+# and dropped whenever a grade for that term is inserted. As in gpa.py, a
+# student's term GPA uses their latest grade for each course in the term.
+
+ANALYTICS_TTL = float(os.getenv("ANALYTICS_TTL", "600"))
+# Grade points at or above this count as a pass (1.0 = D)
+PASS_GRADE_POINTS = float(os.getenv("PASS_GRADE_POINTS", "1.0"))
+GPA_BIN_WIDTH = 0.25
+PERCENTILES = (10, 25, 50, 75, 90)
+
+term_cache = TTLCache(maxsize=64, ttl=ANALYTICS_TTL)
+
+
+class TermStats(NamedTuple):
+    student_ids: "np.ndarray"   # sorted
+    gpas: "np.ndarray"          # aligned with student_ids
+    sorted_gpas: "np.ndarray"
+    distribution: dict
+    courses: list[dict]
+
+
+def available() -> bool:
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+def invalidate_term(term_id: int):
+    term_cache.invalidate(term_id)
+
+
+def term_grades(term_id: int):
+    return select(
+        Grade.student_id, Grade.course_id, Grade.grade_letter,
+        Grade.grade_points, Grade.credits,
+        # raw stored value: ISO-style strings sort like the timestamps and
+        # skip per-row datetime parsing
+        type_coerce(Grade.created_at, String), Grade.id
+    ).where(
+        Grade.term_id == term_id,
+        Grade.student_id.is_not(None),
+        Grade.grade_points.is_not(None),
+        Grade.credits.is_not(None)
+    )
+
+
+def _load_columns(db: Session, term_id: int) -> dict:
+    # Core execution: plain tuples, no ORM row processing; a term spans every shard
+    parts = shards.scatter(lambda session: session.connection().execute(term_grades(term_id)).all(), db)
+    rows = parts[0] if len(parts) == 1 else [row for part in parts for row in part]
+    student, course, letter, points, credits, created, ids = zip(*rows) if rows else ([],) * 7
+    return {
+        "student": np.array(student, dtype=np.int64),
+        "course": np.array([value or 0 for value in course], dtype=np.int64),
+        # fixed-width unicode sorts far faster than object arrays
+        "letter": np.array([value or "" for value in letter], dtype=str),
+        "points": np.array(points, dtype=np.float64),
+        "credits": np.array(credits, dtype=np.float64),
+        "created": np.array([value or "" for value in created], dtype=str),
+        "id": np.array(ids, dtype=np.int64),
+    }
+
+
+def _latest_per_course(cols: dict) -> dict:
+    """Keep one grade per (student, course): the most recent one"""
+    if not len(cols["id"]):
+        return cols
+    order = np.lexsort((cols["id"], cols["created"], cols["course"], cols["student"]))
+    student, course = cols["student"][order], cols["course"][order]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (student[1:] != student[:-1]) | (course[1:] != course[:-1])
+    keep = order[last]
+    return {key: values[keep] for key, values in cols.items()}
+
+
+def _distribution(gpas: "np.ndarray") -> dict:
+    edges = np.arange(0.0, 4.0 + GPA_BIN_WIDTH, GPA_BIN_WIDTH)
+    counts, _ = np.histogram(gpas, bins=edges)
+    if len(gpas):
+        mean, values = float(gpas.mean()), np.percentile(gpas, PERCENTILES)
+    else:
+        mean, values = 0.0, np.zeros(len(PERCENTILES))
+    return {
+        "students": int(len(gpas)),
+        "mean": round(mean, 2),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, values)},
+        "bins": [
+            {"lower": float(lo), "upper": float(hi), "count": int(n)}
+            for lo, hi, n in zip(edges[:-1], edges[1:], counts)
+        ],
+    }
+
+
+def _courses(cols: dict, names: dict) -> list[dict]:
+    """Per-course statistics, by course code; `names` is catalog.course_names"""
+    if not len(cols["id"]):
+        return []
+    ids, course_idx = np.unique(cols["course"], return_inverse=True)
+    letters, letter_idx = np.unique(cols["letter"], return_inverse=True)
+    n_courses = len(ids)
+    students = np.bincount(course_idx, minlength=n_courses)
+    passed = np.bincount(course_idx, weights=cols["points"] >= PASS_GRADE_POINTS, minlength=n_courses)
+    points = np.bincount(course_idx, weights=cols["points"], minlength=n_courses)
+    # course x letter counts in one pass
+    histogram = np.zeros((n_courses, len(letters)), dtype=np.int64)
+    np.add.at(histogram, (course_idx, letter_idx), 1)
+    labels = [names.get(int(course), ("", "")) for course in ids]
+    courses = [
+        {
+            "course_code": labels[i][0],
+            "course_name": labels[i][1] or "",
+            "students": int(students[i]),
+            "passed": int(passed[i]),
+            "pass_rate": round(float(passed[i] / students[i]), 4),
+            "mean_grade_points": round(float(points[i] / students[i]), 2),
+            "grades": {str(letters[j]): int(histogram[i, j]) for j in np.flatnonzero(histogram[i]) if letters[j]},
+        }
+        for i in range(n_courses)
+    ]
+    return sorted(courses, key=lambda course: course["course_code"])
+
+
+def compute_term(db: Session, term_id: int) -> TermStats:
+    _import_numpy()
+    cols = _latest_per_course(_load_columns(db, term_id))
+    student_ids, student_idx = np.unique(cols["student"], return_inverse=True)
+    weighted = np.bincount(student_idx, weights=cols["points"] * cols["credits"], minlength=len(student_ids))
+    credits = np.bincount(student_idx, weights=cols["credits"], minlength=len(student_ids))
+    gpas = np.round(np.divide(weighted, credits, out=np.zeros(len(student_ids)), where=credits > 0), 2)
+    return TermStats(
+        student_ids=student_ids,
+        gpas=gpas,
+        sorted_gpas=np.sort(gpas),
+        distribution=_distribution(gpas),
+        courses=_courses(cols, catalog.course_names(db, np.unique(cols["course"]).tolist())),
+    )
+
+
+def term_stats(db: Session, term_id: int) -> TermStats:
+    stats = term_cache.get(term_id)
+    if stats is None:
+        stats = compute_term(db, term_id)
+        term_cache.set(term_id, stats)
+    return stats
+
+
+def percentile_rank(stats: TermStats, student_id: int) -> tuple[float, float] | None:
+    """(term GPA, % of the cohort at or below it) or None if not enrolled"""
+    i = np.searchsorted(stats.student_ids, student_id)
+    if i >= len(stats.student_ids) or stats.student_ids[i] != student_id:
+        return None
+    gpa = stats.gpas[i]
+    at_or_below = np.searchsorted(stats.sorted_gpas, gpa, side="right")
+    return float(gpa), round(100.0 * at_or_below / len(stats.sorted_gpas), 1)
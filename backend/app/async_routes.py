@@ -0,0 +1,130 @@
+# ✅ Async versions of the read endpoints (enabled with ASYNC_DB=1)
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database import get_async_db
+from schemas import AcademicRecordOut, GradeOut, ClassScheduleOut, AcademicSummary, GradeSummary
+from models import User
+from auth import oauth2_scheme, token_subject, remember_user, user_cache, CurrentUser
+import catalog
+import queries
+import summaries
+import conditional
+from serialization import FAST_RESPONSES, rows_response, output_keys
+from pagination import PageParams, trim_page
+from metrics import timed
+import shards
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    with timed("auth"):
+        email = token_subject(token)
+        current = user_cache.get(email)
+        if current is None:
+            result = await db.execute(select(User).where(User.email == email))
+            current = remember_user(result.scalars().first(), email)
+        shards.bind_student(db, current.id)
+        return current
+
+
+router = APIRouter()
+
+
+@router.get("/academic-records", response_model=List[AcademicRecordOut])
+async def get_academic_records(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = (await db.execute(queries.data_version(current_user.id))).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    result = await db.execute(queries.academic_records_for(current_user.id, columns=queries.ACADEMIC_RECORD_COLUMNS, **page.filters()))
+    rows = trim_page(result.all(), page.limit, queries.ACADEMIC_RECORD_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(AcademicRecordOut), rows, response)
+    return rows
+
+
+@router.get("/grades", response_model=List[GradeOut])
+async def get_grades(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = (await db.execute(queries.data_version(current_user.id))).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    result = await db.execute(queries.grades_for(current_user.id, columns=queries.GRADE_COLUMNS, **page.filters()))
+    rows = trim_page(result.all(), page.limit, queries.GRADE_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(GradeOut), rows, response)
+    return rows
+
+
+@router.get("/class-schedules", response_model=List[ClassScheduleOut])
+async def get_class_schedules(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = (await db.execute(queries.data_version(current_user.id))).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    result = await db.execute(queries.class_schedules_for(current_user.id, columns=queries.CLASS_SCHEDULE_COLUMNS, **page.filters()))
+    rows = trim_page(result.all(), page.limit, queries.CLASS_SCHEDULE_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(ClassScheduleOut), rows, response)
+    return rows
+
+
+@router.get("/academic-summary", response_model=AcademicSummary)
+async def get_academic_summary(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    summary = (await db.execute(queries.student_summary(current_user.id))).scalars().first()
+    active_terms = await db.run_sync(catalog.active_term_ids)
+    if summary is not None:
+        not_modified = conditional.check(request, response, current_user.id, summaries.version(summary, active_terms))
+        if not_modified:
+            return not_modified
+    active_courses = (await db.execute(queries.active_course_count(current_user.id, active_terms))).scalar_one()
+    if summary is not None:
+        return queries.summary_from_row(summary, active_courses)
+    latest_record = (await db.execute(queries.latest_academic_record(current_user.id))).scalars().first()
+    completed_courses = (await db.execute(queries.completed_course_count(current_user.id))).scalar_one()
+    return queries.build_academic_summary(latest_record, active_courses, completed_courses)
+
+
+@router.get("/grade-summary", response_model=List[GradeSummary])
+async def get_grade_summary(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    version = (await db.execute(queries.data_version(current_user.id))).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    result = await db.execute(queries.latest_grades_for(current_user.id, columns=queries.GRADE_SUMMARY_COLUMNS))
+    rows = result.all()
+    if FAST_RESPONSES:
+        return rows_response(output_keys(GradeSummary), rows, response)
+    return rows
@@ -1,25 +1,55 @@
+import hmac
+import os
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal, ReadSessionLocal, READ_YOUR_WRITES_SECONDS
 from models import User
+from cache import TTLCache
+from hashing import pwd_context, get_password_hash, verify_password
+from metrics import timed
+import shards
 
 # ✅ SECRET KEY (change in production!)
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# ✅ Tickets for GET /events: EventSource cannot send headers, so the
+# credential goes in the URL (and from there into access logs and browser
+# history). A ticket only opens event streams and expires quickly.
+EVENT_TICKET_SCOPE = "events"
+EVENT_TICKET_SECONDS = int(os.getenv("EVENT_TICKET_SECONDS", "60"))
+
+# ✅ Authenticated-user cache (keyed by the token subject / email)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+# ✅ Accounts allowed to run college-wide operations such as background jobs
+# (comma-separated emails)
+ADMIN_EMAILS = {email.strip() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+# ✅ Static bearer token for Prometheus scrapers on /metrics (admins can
+# also read it with their own token); unset means admins only
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+class CurrentUser(NamedTuple):
+    """Lightweight, session-independent view of the authenticated user"""
+    id: int
+    email: str
+    full_name: Optional[str]
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+def invalidate_cached_user(email: str) -> None:
+    user_cache.invalidate(email)
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
     to_encode = data.copy()
@@ -27,23 +57,104 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def create_event_ticket(email: str) -> str:
+    return create_access_token({"sub": email, "scope": EVENT_TICKET_SCOPE},
+                               timedelta(seconds=EVENT_TICKET_SECONDS))
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def token_subject(token: str, scope: Optional[str] = None) -> str:
+    """Email of a valid token; access tokens have no scope, so a ticket is
+    not accepted as one and the other way round"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        if email is None or payload.get("scope") != scope:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
+        raise _credentials_exception()
+    return email
+
+def remember_user(user: User | None, email: str) -> CurrentUser:
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    snapshot = CurrentUser(id=user.id, email=user.email, full_name=user.full_name)
+    user_cache.set(email, snapshot)
+    return snapshot
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> CurrentUser:
+    with timed("auth"):
+        email = token_subject(token)
+        current = user_cache.get(email)
+        if current is None:
+            user = db.query(User).filter(User.email == email).first()
+            current = remember_user(user, email)
+        # Commits on this session pin the student's reads to the primary
+        db.info["student_id"] = current.id
+        shards.bind_student(db, current.id)
+        return current
+
+def get_stream_user(
+    ticket: Optional[str] = Query(None, description="From POST /events/ticket, for clients that cannot set headers (EventSource)"),
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> CurrentUser:
+    """get_current_user for long-lived responses: no session stays open
+    for the life of the stream"""
+    if not token and not ticket:
+        raise _credentials_exception()
+    with timed("auth"):
+        email = token_subject(token) if token else token_subject(ticket, EVENT_TICKET_SCOPE)
+        current = user_cache.get(email)
+        if current is None:
+            with SessionLocal() as db:
+                current = remember_user(db.query(User).filter(User.email == email).first(), email)
+        return current
+
+def is_admin(user: CurrentUser) -> bool:
+    return user.email in ADMIN_EMAILS
+
+def get_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+def get_metrics_reader(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> None:
+    """METRICS_TOKEN or an admin's access token"""
+    if not token:
+        raise _credentials_exception()
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+    get_admin_user(get_current_user(token, db))
+
+# ✅ Read-only endpoints: replica session (see database.ReadSessionLocal)
+READ_PRIMARY_COOKIE = "read_primary"
+
+def get_read_db(request: Request, current_user: CurrentUser = Depends(get_current_user)):
+    db = shards.bind_student(
+        ReadSessionLocal(current_user.id, pinned=READ_PRIMARY_COOKIE in request.cookies), current_user.id
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def pin_reads_after_write(request: Request, call_next):
+    """HTTP middleware: a client that just wrote reads from the primary for a
+    few seconds, whichever worker serves it (the in-process pin only covers
+    the worker that handled the write)"""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(READ_PRIMARY_COOKIE, "1", max_age=max(1, round(READ_YOUR_WRITES_SECONDS)),
+                            httponly=True, samesite="lax")
+    return response
@@ -0,0 +1,228 @@
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from models import AcademicRecord, Grade, ClassSchedule
+from schemas import BulkResult, BulkRowError
+import analytics
+import catalog
+import crud
+import events
+import queries
+import shards
+import summaries
+import timetable
+
+# ✅ Rows validated and inserted per transaction
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+# Cap on the per-row errors echoed back (the counts are always complete)
+BULK_MAX_ERRORS = int(os.getenv("BULK_MAX_ERRORS", "1000"))
+
+
+async def _lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body incrementally and yield complete lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(request: Request) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (row number, record, parse error) from an NDJSON or CSV body.
+
+    CSV bodies (Content-Type: text/csv) need a header row; quoted fields
+    cannot span lines. Anything else is read as NDJSON.
+    """
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    header = None
+    row = 0
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+        if is_csv and header is None:
+            header = next(csv.reader([line]))
+            continue
+        row += 1
+        try:
+            if is_csv:
+                values = next(csv.reader([line]))
+                if len(values) != len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+                record = dict(zip(header, values))
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("each line must be a JSON object")
+        except ValueError as exc:
+            yield row, None, str(exc)
+            continue
+        yield row, record, None
+
+
+class _Ingest:
+    """Per-request state for one bulk upload"""
+
+    def __init__(self, db: Session, student_id: int, model, schema: type[BaseModel]):
+        self.db = db
+        self.student_id = student_id
+        self.model = model
+        self.schema = schema
+        self.result = BulkResult(received=0, inserted=0, failed=0, errors=[])
+        # Term ids already taken, for academic records
+        self.terms: set[int] = set()
+        # Per-term timetables, loaded on first use, for class schedules
+        self.timetables: dict[int, timetable.WeeklyTimetable] = {}
+        self.columns = set(model.__table__.columns.keys())
+
+    def fail(self, row: int, error: str):
+        self.result.failed += 1
+        if len(self.result.errors) < BULK_MAX_ERRORS:
+            self.result.errors.append(BulkRowError(row=row, error=error))
+
+    def validate(self, row: int, record: dict) -> dict | None:
+        try:
+            values = self.schema.parse_obj(record).dict()
+        except ValidationError as exc:
+            self.fail(row, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+            ))
+            return None
+        values["student_id"] = self.student_id
+        return values
+
+    def check_terms(self, chunk: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+        """Set-based duplicate-semester check for a chunk of academic records"""
+        term_ids = {values["term_id"] for _, values in chunk}
+        self.terms |= crud.existing_record_terms(self.db, self.student_id, term_ids - self.terms)
+        accepted = []
+        for row, values in chunk:
+            term = values["term_id"]
+            if term in self.terms:
+                self.fail(row, "Record for this semester already exists")
+                continue
+            self.terms.add(term)
+            accepted.append((row, values))
+        return accepted
+
+    def check_slots(self, chunk: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+        """Reject classes overlapping the student's existing or earlier rows,
+        or booking a room another course holds at that time"""
+        bookings = self.room_bookings(chunk)
+        accepted = []
+        for row, values in chunk:
+            term = values["term_id"]
+            week = self.timetables.get(term)
+            if week is None:
+                rows = self.db.execute(queries.term_slots_for(self.student_id, term)).all()
+                week = self.timetables[term] = timetable.WeeklyTimetable(timetable.slot_of(r) for r in rows)
+            timetable.with_slot(values)
+            start = timetable.week_minute(values["day_index"], values["start_minute"])
+            end = timetable.week_minute(values["day_index"], values["end_minute"])
+            clash = week.conflict(start, end)
+            if clash is not None:
+                course = clash.item if isinstance(clash.item, str) else clash.item.course_code
+                self.fail(row, f"Overlaps {course}")
+                continue
+            # same check as POST /class-schedules: rooms are shared by every student
+            booked = next((
+                code for course, code, first, last in bookings.get((term, values.get("room"), values["day_index"]), ())
+                if course != values["course_id"] and first < values["end_minute"] and last > values["start_minute"]
+            ), None)
+            if booked is not None:
+                self.fail(row, f"Room {values['room']} is booked for {booked}")
+                continue
+            week.add(start, end, values["course_code"])
+            accepted.append((row, values))
+        return accepted
+
+    def room_bookings(self, chunk: list[tuple[int, dict]]) -> dict:
+        """(term_id, room, day) -> {(course_id, course_code, start, end)} for
+        the rooms in the chunk, with one query per shard"""
+        wanted = {(values["term_id"], values["room"]) for _, values in chunk if values.get("room")}
+        bookings = {}
+        if not wanted:
+            return bookings
+        stmt = queries.room_bookings({room for _, room in wanted}, {term for term, _ in wanted})
+        for part in shards.scatter(lambda session: session.execute(stmt).all(), self.db):
+            for booking in part:
+                if (booking.term_id, booking.room) in wanted:
+                    bookings.setdefault((booking.term_id, booking.room, booking.day_index), set()).add(
+                        (booking.course_id, booking.course_code, booking.start_minute, booking.end_minute))
+        return bookings
+
+    def flush(self, chunk: list[tuple[int, dict]]):
+        try:
+            # before this chunk's writes: new catalogue entries commit separately
+            catalog.attach_ids(self.db, [values for _, values in chunk])
+        except catalog.CalendarFull as exc:
+            for row, _ in chunk:
+                self.fail(row, str(exc))
+            return
+        except SQLAlchemyError as exc:
+            for row, _ in chunk:
+                self.fail(row, f"catalogue update failed: {exc.__class__.__name__}")
+            return
+        if self.model is AcademicRecord:
+            chunk = self.check_terms(chunk)
+        elif self.model is ClassSchedule:
+            chunk = self.check_slots(chunk)
+        if not chunk:
+            return
+        try:
+            self.db.execute(insert(self.model), [
+                {key: value for key, value in values.items() if key in self.columns} for _, values in chunk
+            ])
+            summaries.rebuild(self.db, [self.student_id])
+            self.db.commit()
+        except SQLAlchemyError as exc:
+            self.db.rollback()
+            # nothing from this chunk was stored: reload its terms' state
+            # from the database if a later chunk needs it
+            for term in {values["term_id"] for _, values in chunk}:
+                self.terms.discard(term)
+                self.timetables.pop(term, None)
+            for row, _ in chunk:
+                self.fail(row, f"insert failed: {exc.__class__.__name__}")
+            return
+        if self.model is Grade:
+            for term in {values["term_id"] for _, values in chunk}:
+                analytics.invalidate_term(term)
+        self.result.inserted += len(chunk)
+
+
+async def ingest(request: Request, db: Session, student_id: int, model, schema) -> BulkResult:
+    state = _Ingest(db, student_id, model, schema)
+    chunk: list[tuple[int, dict]] = []
+    async for row, record, error in iter_records(request):
+        state.result.received += 1
+        if error is not None:
+            state.fail(row, error)
+            continue
+        values = state.validate(row, record)
+        if values is not None:
+            chunk.append((row, values))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await run_in_threadpool(state.flush, chunk)
+            chunk = []
+    if chunk:
+        await run_in_threadpool(state.flush, chunk)
+    state.result.errors.sort(key=lambda err: err.row)
+    if state.result.inserted:
+        events.publish(student_id, "bulk", {"resource": model.__tablename__, "inserted": state.result.inserted})
+    return state.result
+
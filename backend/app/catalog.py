@@ -0,0 +1,297 @@
+import os
+import re
+import threading
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+
+from cache import TTLCache
+from database import get_engine
+from models import Term, Course
+import shards
+
+# ✅ Term calendar and course catalogue
+#
+# Grades, academic records and schedules reference these by integer key
+# instead of repeating the strings on every row. A term's id is a
+# chronological ordinal, start year * 100 + rank (in 2024-2025: Fall 2024
+# = 202410, Spring 2025 = 202430, "Semester 2" = 202452), so term order is
+# plain id order. Terms are looked up by a normalised key (term_key), so
+# "Fall 2024", "fall  2024" and "Fall" in 2024-2025 are the same term,
+# stored with the first spelling seen. Academic years that do not start
+# with a year ("Foundation") get ids below every real year.
+#
+# Both tables are small and read through in-process caches. New entries
+# are committed on their own connection, so a request that rolls back
+# never leaves the caches pointing at a row that does not exist; call
+# these before the request's own writes (SQLite has a single writer).
+# With shards configured, new entries are also copied to every shard.
+
+CALENDAR_TTL = float(os.getenv("CALENDAR_TTL", "300"))
+
+TERM_SPAN = 100
+# season -> (ordinal rank, first day, last day) with days as
+# (years after the academic year's start year, month, day); a number in
+# the name is added to the rank ("Summer 2" = 42)
+SEASONS = {
+    "fall": (10, (0, 8, 15), (0, 12, 31)),
+    "autumn": (10, (0, 8, 15), (0, 12, 31)),
+    "winter": (20, (1, 1, 1), (1, 1, 15)),
+    "spring": (30, (1, 1, 16), (1, 5, 31)),
+    "summer": (40, (1, 6, 1), (1, 8, 14)),
+}
+# "Semester 1", "Term B", ...: 51, 52, ... (numbers and letters up to 9 / i)
+NUMBERED_RANK = 50
+# Other names, in the order they are first seen
+SPARE_RANKS = range(60, TERM_SPAN)
+# Terms of academic years without a leading year, in the order first seen
+UNDATED_YEAR_IDS = range(1, 1000 * TERM_SPAN)
+# Create-payload fields stored in the catalogue rather than on each row
+CATALOG_FIELDS = {"academic_year", "semester", "course_code", "course_name"}
+
+
+class CalendarFull(ValueError):
+    """No ordinal left for another term in an academic year"""
+
+
+class TermInfo(NamedTuple):
+    id: int
+    academic_year: str
+    semester: str
+    starts_on: date | None
+    ends_on: date | None
+
+
+class CourseInfo(NamedTuple):
+    id: int
+    code: str
+    name: str | None
+
+
+_calendar = TTLCache(maxsize=1, ttl=CALENDAR_TTL)
+_courses = TTLCache(maxsize=10_000, ttl=CALENDAR_TTL)
+_lock = threading.Lock()
+
+
+def year_key(academic_year: str) -> int | str:
+    """The start year, or the normalised string for years without one"""
+    match = re.match(r"\s*(\d{4})", academic_year or "")
+    return int(match.group(1)) if match else " ".join((academic_year or "").lower().split())
+
+
+def _words(semester: str) -> list[str]:
+    words = re.findall(r"[a-z]+|\d+", (semester or "").lower())
+    # the year in "Fall 2024" is already in academic_year
+    return [str(int(word)) if word.isdigit() else word for word in words if not (word.isdigit() and len(word) == 4)]
+
+
+def term_key(academic_year: str, semester: str) -> tuple[int | str, str]:
+    """Case, spacing and a repeated year do not make a different term"""
+    return year_key(academic_year), " ".join(_words(semester))
+
+
+def season_of(semester: str) -> str | None:
+    return next((word for word in _words(semester) if word in SEASONS), None)
+
+
+def _rank(semester: str) -> int | None:
+    words = _words(semester)
+    number = next((int(word) for word in words if word.isdigit() and 1 <= int(word) <= 9), None)
+    if number is None:
+        number = next((ord(word) - ord("a") + 1 for word in words if len(word) == 1 and "a" <= word <= "i"), None)
+    season = season_of(semester)
+    if season is not None:
+        return SEASONS[season][0] + (number or 0)
+    return NUMBERED_RANK + number if number is not None else None
+
+
+def new_term(academic_year: str, semester: str, taken=()) -> dict:
+    """Row for a calendar entry, with the first free ordinal of its year"""
+    year = year_key(academic_year)
+    if isinstance(year, str):
+        candidates = UNDATED_YEAR_IDS
+    else:
+        rank = _rank(semester)
+        candidates = [year * TERM_SPAN + rank for rank in ([rank] if rank else []) + list(SPARE_RANKS)]
+    ordinal = next((candidate for candidate in candidates if candidate not in taken), None)
+    if ordinal is None:
+        raise CalendarFull(f"No room for another term in {academic_year}")
+    starts_on = ends_on = None
+    season = season_of(semester)
+    if season is not None and not isinstance(year, str):
+        _, first, last = SEASONS[season]
+        starts_on = date(year + first[0], first[1], first[2])
+        ends_on = date(year + last[0], last[1], last[2])
+    return {"id": ordinal, "academic_year": academic_year, "semester": semester,
+            "starts_on": starts_on, "ends_on": ends_on}
+
+
+def _load_calendar(db) -> dict[tuple[int | str, str], TermInfo]:
+    rows = db.execute(select(Term.id, Term.academic_year, Term.semester, Term.starts_on, Term.ends_on))
+    terms = {term_key(row.academic_year, row.semester): TermInfo(*row) for row in rows}
+    _calendar.set("terms", terms)
+    return terms
+
+
+def calendar(db) -> dict[tuple[int | str, str], TermInfo]:
+    """Every term, keyed by term_key"""
+    terms = _calendar.get("terms")
+    return _load_calendar(db) if terms is None else terms
+
+
+def find_term(db, academic_year: str, semester: str) -> int | None:
+    """Id of an existing term (None if it is not in the calendar)"""
+    if academic_year is None or semester is None:
+        return None
+    key = term_key(academic_year, semester)
+    term = calendar(db).get(key)
+    if term is None:
+        # another worker may have added it since the calendar was cached
+        term = _load_calendar(db).get(key)
+    return term.id if term else None
+
+
+def current_term(db, today: date | None = None) -> TermInfo | None:
+    """The most recently started term"""
+    today = today or date.today()
+    started = [term for term in calendar(db).values() if term.starts_on is not None and term.starts_on <= today]
+    return max(started, key=lambda term: (term.starts_on, term.id)) if started else None
+
+
+def current_term_id(db) -> int | None:
+    term = current_term(db)
+    return term.id if term else None
+
+
+def active_term_ids(db, today: date | None = None) -> list[int]:
+    """Terms whose classes count as active: the current term, plus every
+    term of the current academic year without season dates ("Semester 1")"""
+    today = today or date.today()
+    current = current_term(db, today)
+    first_day = SEASONS["fall"][1]
+    year = today.year if (today.month, today.day) >= first_day[1:] else today.year - 1
+    undated = [term.id for term in calendar(db).values()
+               if term.starts_on is None and term.id // TERM_SPAN == year]
+    return sorted(set(undated + ([current.id] if current else [])))
+
+
+def _add_terms(pairs: set[tuple[str, str]]) -> dict[tuple[int | str, str], TermInfo]:
+    for attempt in range(2):
+        try:
+            with _lock, get_engine().begin() as conn:
+                terms = dict(_load_calendar(conn))
+                taken = {term.id for term in terms.values()}
+                rows = []
+                for academic_year, semester in sorted(pairs):
+                    if term_key(academic_year, semester) in terms:
+                        continue
+                    rows.append(new_term(academic_year, semester, taken))
+                    taken.add(rows[-1]["id"])
+                    terms[term_key(academic_year, semester)] = TermInfo(**rows[-1])
+                if rows:
+                    conn.execute(insert(Term), rows)
+                    _calendar.set("terms", terms)
+            shards.copy_reference(Term, rows)
+            return terms
+        except IntegrityError:
+            # a concurrent worker added the same term (or took the ordinal)
+            _calendar.invalidate("terms")
+            if attempt:
+                raise
+
+
+def terms_for(db, pairs) -> dict[tuple[str, str], TermInfo]:
+    """Calendar entries for (academic_year, semester) pairs, adding missing terms"""
+    keys = {pair: term_key(*pair) for pair in pairs}
+    terms = calendar(db)
+    if not set(keys.values()) <= terms.keys():
+        terms = _add_terms(set(keys))
+    return {pair: terms[key] for pair, key in keys.items()}
+
+
+def term_ids(db, pairs) -> dict[tuple[str, str], int]:
+    """Ids for (academic_year, semester) pairs, adding missing terms to the calendar"""
+    return {pair: term.id for pair, term in terms_for(db, pairs).items()}
+
+
+def term(db, academic_year: str, semester: str) -> TermInfo:
+    return terms_for(db, [(academic_year, semester)])[(academic_year, semester)]
+
+
+def term_id(db, academic_year: str, semester: str) -> int:
+    return term(db, academic_year, semester).id
+
+
+def _add_courses(courses: dict[str, str | None]) -> dict[str, CourseInfo]:
+    stored = select(Course.id, Course.code, Course.name).where(Course.code.in_(courses))
+    for attempt in range(2):
+        try:
+            with _lock, get_engine().begin() as conn:
+                found = {row.code: CourseInfo(*row) for row in conn.execute(stored)}
+                rows = [{"code": code, "name": name} for code, name in courses.items() if code not in found]
+                if rows:
+                    conn.execute(insert(Course), rows)
+                    found = {row.code: CourseInfo(*row) for row in conn.execute(stored)}
+            shards.copy_reference(Course, [{"id": found[row["code"]].id, **row} for row in rows])
+            return found
+        except IntegrityError:
+            # a concurrent worker added the same course
+            if attempt:
+                raise
+
+
+def courses_for(courses: dict[str, str | None]) -> dict[str, CourseInfo]:
+    """Catalogue entries for course codes, adding missing ones with the given names.
+
+    The first name seen for a code is kept; later names are ignored.
+    """
+    found = {code: _courses.get(code) for code in courses}
+    missing = {code: courses[code] for code, course in found.items() if course is None}
+    if missing:
+        added = _add_courses(missing)
+        for code, course in added.items():
+            _courses.set(code, course)
+        found.update(added)
+    return found
+
+
+def course_ids(courses: dict[str, str | None]) -> dict[str, int]:
+    """Ids for course codes, adding missing ones with the given names"""
+    return {code: course.id for code, course in courses_for(courses).items()}
+
+
+def course(code: str, name: str | None = None) -> CourseInfo:
+    return courses_for({code: name})[code]
+
+
+def course_id(code: str, name: str | None = None) -> int:
+    return course(code, name).id
+
+
+def stored_values(values: dict, term: TermInfo, course: CourseInfo | None = None) -> dict:
+    """Create-payload values as reads return them: the catalogue's spelling
+    of the term and the course's first-seen name"""
+    values = {**values, "academic_year": term.academic_year, "semester": term.semester}
+    if course is not None:
+        values["course_name"] = course.name
+    return values
+
+
+def attach_ids(db, rows: list[dict]) -> list[dict]:
+    """Add term_id (and course_id) to validated create payloads, in place"""
+    terms = term_ids(db, {(row["academic_year"], row["semester"]) for row in rows})
+    courses = course_ids({row["course_code"]: row["course_name"] for row in rows if "course_code" in row})
+    for row in rows:
+        row["term_id"] = terms[(row["academic_year"], row["semester"])]
+        if "course_code" in row:
+            row["course_id"] = courses[row["course_code"]]
+    return rows
+
+
+def course_names(db, ids) -> dict[int, tuple[str, str | None]]:
+    """(code, name) for course ids"""
+    rows = db.execute(select(Course.id, Course.code, Course.name).where(Course.id.in_(list(ids))))
+    return {row.id: (row.code, row.name) for row in rows}
+
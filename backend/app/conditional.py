@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import Request, Response
+
+# ✅ ETag / If-None-Match support keyed on StudentSummary.data_version
+#
+# The tag covers the student, their data version and the full request URL
+# (path + query), so every page and filter combination has its own tag.
+
+
+def etag_for(request: Request, student_id: int, version: int | str) -> str:
+    key = f"{student_id}:{version}:{request.url.path}?{request.url.query}"
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:]
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def check(request: Request, response: Response, student_id: int, version: int | str | None) -> Response | None:
+    """Tag the response; return a 304 response if the client's copy is current.
+
+    Students without a summary row yet (version None) are served untagged.
+    """
+    if version is None:
+        return None
+    etag = etag_for(request, student_id, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    header = request.headers.get("if-none-match")
+    if header and _matches(header, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
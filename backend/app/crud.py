@@ -1,7 +1,10 @@
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from models import User
+from models import User, AcademicRecord, StudentSummary
 from schemas import UserCreate
-from auth import get_password_hash
+from auth import get_password_hash, invalidate_cached_user
+import analytics
+import shards
 
 
 # ✅ Create new user
@@ -11,6 +14,7 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    shards.copy_user(db_user)
     return db_user
 
 
@@ -19,17 +23,28 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
 
-# ✅ Get all users
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+# ✅ Get users a page at a time (keyset on id: pass the last id seen).
+# Users are not sharded: the directory on the primary lists every student.
+def get_users(db: Session, after_id: int | None = None, limit: int = 100) -> list[User]:
+    query = db.query(User)
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    return query.order_by(User.id).limit(limit).all()
 
 
 # ✅ Delete user by email
 def delete_user(db: Session, email: str) -> bool:
     user = db.query(User).filter(User.email == email).first()
     if user:
+        # the student's records are on their shard
+        shards.bind_student(db, user.id)
+        # the summary row is not a relationship of User; drop it first
+        db.execute(delete(StudentSummary).where(StudentSummary.student_id == user.id))
         db.delete(user)
         db.commit()
+        shards.forget_user(user.id)
+        invalidate_cached_user(email)
+        analytics.term_cache.clear()
         return True
     return False
 
@@ -41,5 +56,19 @@ def update_user_password(db: Session, email: str, new_password: str) -> User | N
         user.hashed_password = get_password_hash(new_password)
         db.commit()
         db.refresh(user)
+        invalidate_cached_user(email)
         return user
     return None
+
+
+# ✅ Which terms (by id) already have a record
+def existing_record_terms(db: Session, student_id: int, term_ids) -> set[int]:
+    term_ids = list(term_ids)
+    if not term_ids:
+        return set()
+    return set(db.execute(
+        select(AcademicRecord.term_id).where(
+            AcademicRecord.student_id == student_id,
+            AcademicRecord.term_id.in_(term_ids)
+        )
+    ).scalars())
@@ -0,0 +1,54 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from auth import CurrentUser
+from pagination import DEFAULT_PAGE_SIZE, split_page
+from schemas import GradeSummary, GradeOut, ClassScheduleOut
+from serialization import rows_to_dicts, output_keys
+import queries
+import summaries
+
+# ✅ Everything the dashboard shows, in one request
+#
+# One authentication, one session and at most five statements: the summary
+# row (which also carries the ETag version), the active course count, latest
+# grades, the first page of grades and the first page of the schedule.
+SECTIONS = ("me", "academic_summary", "grade_summary", "grades", "class_schedules")
+
+
+def parse_sections(sections: str | None) -> set[str]:
+    if not sections:
+        return set(SECTIONS)
+    wanted = {name.strip().replace("-", "_") for name in sections.split(",") if name.strip()}
+    unknown = wanted - set(SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))} (choose from {', '.join(SECTIONS)})"
+        )
+    return wanted
+
+
+def build(db: Session, user: CurrentUser, sections: set[str], summary) -> dict:
+    """Dashboard content as plain dicts; `summary` is the pre-read summary row"""
+    content = {}
+    if "me" in sections:
+        content["me"] = {"email": user.email, "full_name": user.full_name, "id": user.id}
+    if "academic_summary" in sections:
+        content["academic_summary"] = summaries.academic_summary(db, user.id, summary).dict()
+    if "grade_summary" in sections:
+        rows = db.execute(queries.latest_grades_for(user.id, columns=queries.GRADE_SUMMARY_COLUMNS)).all()
+        content["grade_summary"] = rows_to_dicts(output_keys(GradeSummary), rows)
+    if "grades" in sections:
+        rows = db.execute(queries.grades_for(
+            user.id, columns=queries.GRADE_COLUMNS, limit=DEFAULT_PAGE_SIZE + 1
+        )).all()
+        rows, content["grades_next_cursor"] = split_page(rows, DEFAULT_PAGE_SIZE, queries.GRADE_ORDER)
+        content["grades"] = rows_to_dicts(output_keys(GradeOut), rows)
+    if "class_schedules" in sections:
+        rows = db.execute(queries.class_schedules_for(
+            user.id, columns=queries.CLASS_SCHEDULE_COLUMNS, limit=DEFAULT_PAGE_SIZE + 1
+        )).all()
+        rows, content["class_schedules_next_cursor"] = split_page(rows, DEFAULT_PAGE_SIZE, queries.CLASS_SCHEDULE_ORDER)
+        content["class_schedules"] = rows_to_dicts(output_keys(ClassScheduleOut), rows)
+    return content
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+from serialization import dumps
+
+# ✅ Change feed for GET /events (server-sent events)
+#
+# The create endpoints publish what they wrote to the student's open streams
+# instead of clients polling /grades and /academic-summary. The bus lives in
+# the worker's event loop: a stream is a short deque plus the response's
+# generator waiting on it, so an idle connection costs a few hundred bytes
+# and no timer (one keepalive task serves every stream). Handlers running in
+# the threadpool publish with call_soon_threadsafe; nobody listening costs a
+# dict lookup.
+#
+# Backpressure: a client that falls EVENT_QUEUE_SIZE events behind loses
+# them and gets one "resync" event instead, so publishers never wait and a
+# slow reader never holds more than that in memory. A stream ends after
+# EVENT_MAX_PER_STREAM events or EVENT_STREAM_SECONDS (clients reconnect
+# after EVENT_RETRY_MS); the "ready" event sent on every (re)connect tells
+# the client to revalidate its data with If-None-Match.
+#
+# Streams only see writes handled by the same worker process.
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "32"))
+EVENT_MAX_PER_STREAM = int(os.getenv("EVENT_MAX_PER_STREAM", "1000"))
+EVENT_STREAM_SECONDS = float(os.getenv("EVENT_STREAM_SECONDS", "900"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+EVENT_MAX_STREAMS = int(os.getenv("EVENT_MAX_STREAMS", "50000"))
+EVENT_MAX_STREAMS_PER_STUDENT = int(os.getenv("EVENT_MAX_STREAMS_PER_STUDENT", "5"))
+EVENT_RETRY_MS = int(os.getenv("EVENT_RETRY_MS", "3000"))
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class TooManyStreams(Exception):
+    """The worker or the student already has the maximum number of streams"""
+
+
+def frame(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+_KEEPALIVE = b": keepalive\n\n"
+_RESYNC = frame("resync", {})
+_CLOSE = None
+
+
+class Stream:
+    __slots__ = ("student_id", "pending", "waiter", "opened", "closed")
+
+    def __init__(self, student_id: int):
+        self.student_id = student_id
+        self.pending: deque = deque()
+        self.waiter: asyncio.Future | None = None
+        self.opened = time.monotonic()
+        self.closed = False
+
+    def push(self, item: bytes | None) -> int:
+        """Queue an item without waiting; returns the events dropped"""
+        dropped = 0
+        if self.closed:
+            return 0
+        if item is _CLOSE:
+            self.closed = True
+        elif len(self.pending) >= EVENT_QUEUE_SIZE:
+            if item is _KEEPALIVE:
+                return 0
+            # the client is too far behind: replace its backlog with a resync
+            dropped = 1 + sum(queued not in (_KEEPALIVE, _RESYNC) for queued in self.pending)
+            self.pending.clear()
+            item = _RESYNC
+        self.pending.append(item)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+        return dropped
+
+    async def get(self) -> bytes | None:
+        while not self.pending:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        return self.pending.popleft()
+
+
+class Bus:
+    """Student id -> open streams, owned by one event loop"""
+
+    def __init__(self):
+        self._streams: dict[int, set[Stream]] = {}
+        self._count = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._keepalive: asyncio.Task | None = None
+        self.sent = 0
+        self.dropped = 0
+
+    def admit(self, student_id: int) -> None:
+        """Raise TooManyStreams if another stream would exceed the limits"""
+        if self._count >= EVENT_MAX_STREAMS:
+            raise TooManyStreams("Too many open event streams, retry shortly")
+        if len(self._streams.get(student_id, ())) >= EVENT_MAX_STREAMS_PER_STUDENT:
+            raise TooManyStreams(f"At most {EVENT_MAX_STREAMS_PER_STUDENT} event streams per student")
+
+    def open(self, student_id: int) -> Stream:
+        """Register a stream (call from the event loop)"""
+        self.admit(student_id)
+        stream = Stream(student_id)
+        self._streams.setdefault(student_id, set()).add(stream)
+        self._count += 1
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        if self._keepalive is None or self._keepalive.done() or self._keepalive.get_loop() is not loop:
+            self._keepalive = loop.create_task(self._send_keepalives())
+        return stream
+
+    def close(self, stream: Stream) -> None:
+        streams = self._streams.get(stream.student_id)
+        if streams is None or stream not in streams:
+            return
+        streams.discard(stream)
+        if not streams:
+            del self._streams[stream.student_id]
+        self._count -= 1
+
+    async def iterate(self, student_id: int) -> AsyncIterator[bytes]:
+        """The response body: events until the stream ends or the client leaves.
+
+        The stream is registered here rather than in the request handler: a
+        client that disconnects before the body starts never runs this
+        generator, so nothing would unregister it.
+        """
+        try:
+            stream = self.open(student_id)
+        except TooManyStreams:
+            # filled up since the handler's admit(); the client reconnects
+            yield f"retry: {EVENT_RETRY_MS}\n\n".encode()
+            return
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n".encode() + frame("ready", {})
+            sent = 0
+            while sent < EVENT_MAX_PER_STREAM:
+                item = await stream.get()
+                if item is _CLOSE:
+                    break
+                yield item
+                if item is not _KEEPALIVE:
+                    sent += 1
+                    self.sent += 1
+        finally:
+            self.close(stream)
+
+    def publish(self, student_id: int, event: str, data: Any) -> None:
+        """Send an event to the student's streams; safe to call from any thread"""
+        loop = self._loop
+        if loop is None or student_id not in self._streams or loop.is_closed():
+            return
+        item = frame(event, data)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(student_id, item)
+        else:
+            loop.call_soon_threadsafe(self._deliver, student_id, item)
+
+    def _deliver(self, student_id: int, item: bytes | None) -> None:
+        for stream in self._streams.get(student_id, ()):
+            self.dropped += stream.push(item)
+
+    async def _send_keepalives(self):
+        while self._count:
+            await asyncio.sleep(EVENT_KEEPALIVE_SECONDS)
+            expired = time.monotonic() - EVENT_STREAM_SECONDS
+            for streams in list(self._streams.values()):
+                for stream in list(streams):
+                    if stream.opened < expired:
+                        # unregister now as well, in case nobody reads the stream
+                        stream.push(_CLOSE)
+                        self.close(stream)
+                    elif not stream.pending:
+                        stream.push(_KEEPALIVE)
+
+    def shutdown(self) -> None:
+        """End every open stream (worker shutdown)"""
+        for student_id in list(self._streams):
+            self._deliver(student_id, _CLOSE)
+
+    def stats(self) -> dict:
+        return {"streams": self._count, "sent": self.sent, "dropped": self.dropped}
+
+
+bus = Bus()
+
+
+def publish(student_id: int, event: str, data: Any) -> None:
+    bus.publish(student_id, event, data)
@@ -0,0 +1,53 @@
+from datetime import datetime
+from schemas import TermGPA, GPAReport
+
+# Credit-weighted GPA derived from the grades table rather than the
+# hand-entered AcademicRecord.gpa.
+#
+# - Term GPA uses the most recent grade for each course within the term
+#   (e.g. the final replaces the midterm).
+# - Cumulative GPA counts each course once, using the attempt from the
+#   latest term in which it was taken (repeats replace earlier attempts).
+
+
+def _weighted(attempts) -> tuple[float, int]:
+    credits = sum(a.credits for a in attempts)
+    if not credits:
+        return 0.0, 0
+    points = sum(a.grade_points * a.credits for a in attempts)
+    return round(points / credits, 2), credits
+
+
+def _recency(row):
+    return (row.created_at or datetime.min, row.id)
+
+
+def compute_gpa(rows) -> GPAReport:
+    """Build a GPA report from rows shaped like queries.gpa_grades_for"""
+    # keyed by (term id, academic_year, semester): term ids sort chronologically
+    terms: dict[tuple[int, str, str], dict[int, object]] = {}
+    for row in rows:
+        if row.grade_points is None or row.credits is None or row.term_id is None:
+            continue
+        courses = terms.setdefault((row.term_id, row.academic_year, row.semester), {})
+        current = courses.get(row.course_id)
+        if current is None or _recency(row) > _recency(current):
+            courses[row.course_id] = row
+
+    report = []
+    taken: dict[int, object] = {}
+    for term in sorted(terms):
+        courses = terms[term]
+        taken.update(courses)
+        gpa, credits = _weighted(courses.values())
+        cumulative_gpa, _ = _weighted(taken.values())
+        report.append(TermGPA(
+            academic_year=term[1],
+            semester=term[2],
+            gpa=gpa,
+            credits=credits,
+            cumulative_gpa=cumulative_gpa
+        ))
+
+    cumulative_gpa, total_credits = _weighted(taken.values())
+    return GPAReport(cumulative_gpa=cumulative_gpa, total_credits=total_credits, terms=report)
@@ -0,0 +1,68 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from metrics import timed
+
+# ✅ bcrypt cost and worker pool size (tune per deployment)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 8)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor: ProcessPoolExecutor | None = None
+_pending = asyncio.Semaphore(HASH_MAX_PENDING)
+
+
+class HashPoolBusy(Exception):
+    """HASH_MAX_PENDING hash jobs are already in flight"""
+
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password and return a new hash if the stored one is outdated"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawned, not forked: a fork would copy the server's open database
+        # connections and event loop state into the workers
+        _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+async def _run(func, *args):
+    # At most HASH_MAX_PENDING hash jobs in flight; beyond that the request
+    # is turned away (503) instead of piling up behind the pool.
+    if _pending.locked():
+        raise HashPoolBusy("Too many logins in progress, retry shortly")
+    with timed("bcrypt"):
+        async with _pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(get_password_hash, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await _run(verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,349 @@
+import csv
+import heapq
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, update, func, or_, and_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, get_engine, get_shard_engines
+from models import User, Grade, Term, Job
+import export
+import gpa
+import shards
+import summaries
+
+# ✅ Background jobs for cohort-wide computations
+#
+# A job is a row in the jobs table. The worker that accepts it splits the
+# students into id ranges of JOB_CHUNK_SIZE and runs the chunks in a
+# process pool, so a long computation neither blocks request handling nor
+# holds the GIL; a thread per job collects the chunks and records progress
+# (and a heartbeat) in the row as each one finishes.
+#
+# Cancelling marks the row; the job thread sees it at the next finished
+# chunk, drops the chunks that have not started and stops. Chunks are
+# idempotent, so a job orphaned by a stopped worker (no heartbeat for
+# JOB_STALE_SECONDS) is queued again and resumed by the next worker to
+# start.
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "2000"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "600"))
+# Files written by gpa-report and transcripts jobs (one directory per job)
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "./job_output")
+
+ACTIVE = ("queued", "running", "cancelling")
+
+logger = logging.getLogger("college.jobs")
+
+_executor: ProcessPoolExecutor | None = None
+_threads: dict[int, threading.Thread] = {}
+_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+# -------------------------------
+# Work done in the pool processes (one chunk of students each)
+# -------------------------------
+
+def _students(first: int, last: int) -> dict[int, list[int]]:
+    """Directory ids in [first, last], by the shard that holds their data"""
+    with SessionLocal() as db:
+        ids = db.execute(select(User.id).where(User.id.between(first, last)).order_by(User.id)).scalars().all()
+    grouped: dict[int, list[int]] = {}
+    for student_id in ids:
+        grouped.setdefault(shards.shard_of(student_id) if shards.enabled() else 0, []).append(student_id)
+    return grouped
+
+
+def _session(shard: int) -> Session:
+    return SessionLocal() if shard == 0 else Session(bind=get_shard_engines()[shard])
+
+
+def output_path(job_id: int, name: str = "") -> str:
+    return os.path.join(JOB_OUTPUT_DIR, f"job-{job_id}", name)
+
+
+def _rebuild_summaries(job_id: int, params: dict, first: int, last: int) -> dict:
+    count = 0
+    for shard, ids in _students(first, last).items():
+        with _session(shard) as db:
+            count += summaries.rebuild(db, ids)
+            db.commit()
+    return {"summaries": count}
+
+
+def _gpa_rows(ids: list[int]):
+    """queries.gpa_grades_for for several students, grouped by student"""
+    return select(
+        Grade.student_id, Grade.id, Grade.course_id, Grade.term_id, Term.academic_year, Term.semester,
+        Grade.grade_points, Grade.credits, Grade.created_at
+    ).select_from(Grade).outerjoin(
+        Term, Term.id == Grade.term_id
+    ).where(
+        Grade.student_id.in_(ids)
+    ).order_by(
+        Grade.student_id, Grade.term_id.desc(), Grade.course_id
+    )
+
+
+def _gpa_report(job_id: int, params: dict, first: int, last: int) -> dict:
+    """Cumulative GPA and credits per student, computed from the grades as /gpa does"""
+    grouped = _students(first, last)
+    if not grouped:
+        return {}
+    name = f"gpa-{first}-{last}.csv"
+    students = 0
+    with open(output_path(job_id, name), "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(["student_id", "cumulative_gpa", "total_credits", "terms"])
+        for shard, ids in sorted(grouped.items()):
+            with _session(shard) as db:
+                rows = db.execute(_gpa_rows(ids))
+                for student_id, grades in itertools.groupby(rows, key=lambda row: row.student_id):
+                    report = gpa.compute_gpa(grades)
+                    writer.writerow([student_id, report.cumulative_gpa, report.total_credits, len(report.terms)])
+                    students += 1
+    return {"students": students, "files": [name]}
+
+
+def _transcripts(job_id: int, params: dict, first: int, last: int) -> dict:
+    """The cohort transcript export for a range of students, one file per chunk"""
+    grouped = _students(first, last)
+    if not grouped:
+        return {}
+    fmt = params.get("format", "csv")
+    stmt = export.transcript_query(academic_year=params.get("academic_year"), semester=params.get("semester"))
+    name = f"transcripts-{first}-{last}.{fmt}"
+    sessions = {shard: _session(shard) for shard in grouped}
+    try:
+        # each student lives on one shard, so merging by student keeps the export order
+        rows = heapq.merge(
+            *(export.iter_rows(db, stmt.where(Grade.student_id.in_(grouped[shard]))) for shard, db in sessions.items()),
+            key=lambda row: row[0]
+        )
+        with open(output_path(job_id, name), "w", newline="", encoding="utf-8") as out:
+            for chunk in export.ENCODERS[fmt](rows):
+                out.write(chunk)
+    finally:
+        for db in sessions.values():
+            db.close()
+    return {"students": sum(len(ids) for ids in grouped.values()), "files": [name]}
+
+
+KINDS = {
+    "rebuild-summaries": _rebuild_summaries,
+    "gpa-report": _gpa_report,
+    "transcripts": _transcripts,
+}
+
+
+def _run_chunk(kind: str, job_id: int, params: dict, first: int, last: int) -> dict:
+    return KINDS[kind](job_id, params, first, last)
+
+
+def _combine(parts: list[dict]) -> dict:
+    """Add up the chunk results (counts are summed, file lists joined)"""
+    total: dict = {}
+    for part in parts:
+        for key, value in part.items():
+            total[key] = total[key] + value if key in total else value
+    if "files" in total:
+        total["files"].sort()
+    return total
+
+
+# -------------------------------
+# Job rows
+# -------------------------------
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _set(job_id: int, **values) -> None:
+    with get_engine().begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+
+def _status(job_id: int) -> str | None:
+    with get_engine().connect() as conn:
+        return conn.execute(select(Job.status).where(Job.id == job_id)).scalar()
+
+
+def get(db: Session, job_id: int) -> Job | None:
+    return db.get(Job, job_id)
+
+
+def recent(db: Session, limit: int = 20) -> list[Job]:
+    return db.execute(select(Job).order_by(Job.id.desc()).limit(limit)).scalars().all()
+
+
+def as_dict(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": json.loads(job.params or "{}"),
+        "chunks_total": job.chunks_total,
+        "chunks_done": job.chunks_done,
+        "progress": round(job.chunks_done / job.chunks_total, 4) if job.chunks_total else float(job.status == "succeeded"),
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def student_ranges(first: int | None, last: int | None, size: int = JOB_CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Inclusive id ranges covering the directory (or the given part of it)"""
+    with get_engine().connect() as conn:
+        low, high = conn.execute(select(func.min(User.id), func.max(User.id))).one()
+    if low is None:
+        return []
+    first = low if first is None else max(first, low)
+    last = high if last is None else min(last, high)
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+
+def submit(kind: str, params: dict, user_id: int | None = None) -> int:
+    """Record a job and start it in this worker"""
+    with get_engine().begin() as conn:
+        job_id = conn.execute(insert(Job).values(
+            kind=kind, status="queued", params=json.dumps(params), chunks_total=0, chunks_done=0,
+            submitted_by=user_id, created_at=_now()
+        )).inserted_primary_key[0]
+    _start(job_id)
+    return job_id
+
+
+def cancel(job_id: int) -> bool:
+    """Ask a job to stop; False if it had already finished"""
+    for _ in range(2):
+        with get_engine().begin() as conn:
+            status = conn.execute(select(Job.status).where(Job.id == job_id)).scalar()
+            if status not in ACTIVE:
+                return False
+            if status == "cancelling":
+                return True
+            # a queued job never started: nothing to wait for
+            values = {"status": "cancelled", "finished_at": _now()} if status == "queued" else {"status": "cancelling"}
+            if conn.execute(update(Job).where(Job.id == job_id, Job.status == status).values(**values)).rowcount:
+                return True
+        # claimed in the meantime; try again with the new status
+    return False
+
+
+# -------------------------------
+# Running jobs
+# -------------------------------
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawned, not forked: a fork would share this process's open
+            # database connections with the children
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _start(job_id: int) -> None:
+    thread = threading.Thread(target=_drive, args=(job_id,), name=f"job-{job_id}", daemon=True)
+    with _lock:
+        _threads[job_id] = thread
+    thread.start()
+
+
+def _drive(job_id: int) -> None:
+    try:
+        _execute(job_id)
+    except Exception as exc:
+        if _stopping.is_set():
+            # the worker is shutting down: leave the job for the next one
+            _set(job_id, status="queued")
+        else:
+            _set(job_id, status="failed", error=f"{type(exc).__name__}: {exc}", finished_at=_now())
+    finally:
+        with _lock:
+            _threads.pop(job_id, None)
+
+
+def _execute(job_id: int) -> None:
+    with get_engine().begin() as conn:
+        claimed = conn.execute(update(Job).where(Job.id == job_id, Job.status == "queued").values(
+            status="running", started_at=_now(), heartbeat_at=_now(), chunks_done=0
+        )).rowcount
+        job = conn.execute(select(Job.kind, Job.params).where(Job.id == job_id)).one()
+    if not claimed:
+        return  # cancelled, or another worker has it
+    params = json.loads(job.params or "{}")
+    ranges = student_ranges(params.get("from_student_id"), params.get("to_student_id"))
+    _set(job_id, chunks_total=len(ranges))
+    if job.kind in ("gpa-report", "transcripts"):
+        os.makedirs(output_path(job_id), exist_ok=True)
+
+    executor = _get_executor()
+    futures = [executor.submit(_run_chunk, job.kind, job_id, params, first, last) for first, last in ranges]
+    parts = []
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            parts.append(future.result())
+            _set(job_id, chunks_done=done, heartbeat_at=_now())
+            if _status(job_id) == "cancelling":
+                for pending in futures:
+                    pending.cancel()
+                _set(job_id, status="cancelled", result=json.dumps(_combine(parts)), finished_at=_now())
+                return
+    except BaseException:
+        for pending in futures:
+            pending.cancel()
+        raise
+    _set(job_id, status="succeeded", result=json.dumps(_combine(parts)), finished_at=_now())
+
+
+def resume() -> int:
+    """Queue orphaned jobs again and start every queued one (worker startup)"""
+    _stopping.clear()
+    stale = _now() - timedelta(seconds=JOB_STALE_SECONDS)
+    orphaned = and_(Job.heartbeat_at < stale, or_(Job.status == "running", Job.status == "cancelling"))
+    with get_engine().begin() as conn:
+        conn.execute(update(Job).where(orphaned, Job.status == "cancelling").values(
+            status="cancelled", finished_at=_now()))
+        conn.execute(update(Job).where(orphaned).values(status="queued"))
+        queued = conn.execute(select(Job.id).where(Job.status == "queued").order_by(Job.id)).scalars().all()
+    for job_id in queued:
+        _start(job_id)
+    return len(queued)
+
+
+def resume_in_background() -> None:
+    """resume() without holding up worker startup"""
+    def run():
+        try:
+            resumed = resume()
+        except Exception:
+            logger.exception("Could not resume background jobs")
+        else:
+            if resumed:
+                logger.info("Resumed %d background jobs", resumed)
+    threading.Thread(target=run, name="jobs-resume", daemon=True).start()
+
+
+def shutdown() -> None:
+    global _executor
+    _stopping.set()
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    for thread in list(_threads.values()):
+        thread.join(timeout=5)
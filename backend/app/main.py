@@ -1,34 +1,136 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse, FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import engine, Base, get_db
+from contextlib import asynccontextmanager
+import os
+from database import (
+    Base, get_db, get_engine, get_replica_engines, get_shard_engines, dispose_engine, dispose_async_engine, pool_stats,
+    ASYNC_DB, DB_CREATE_ALL, DATABASE_REPLICA_URLS
+)
 from models import User, AcademicRecord, Grade, ClassSchedule
 from schemas import (
     UserCreate, UserOut, Token, AcademicRecordOut, AcademicRecordCreate,
     GradeOut, GradeCreate, ClassScheduleOut, ClassScheduleCreate,
-    AcademicSummary, GradeSummary
+    AcademicSummary, GradeSummary, GPAReport, BulkResult, Dashboard,
+    FreeSlot, RoomOccupancy, GPADistribution, PercentileRank, CourseStats, SearchResult, JobCreate, JobOut, StreamTicket
+)
+from auth import (
+    create_access_token, create_event_ticket, EVENT_TICKET_SECONDS, get_current_user, get_admin_user, get_metrics_reader, is_admin, get_stream_user, get_read_db, pin_reads_after_write, CurrentUser, user_cache
 )
-from auth import get_password_hash, verify_password, create_access_token, get_current_user
+from hashing import hash_password_async, verify_and_update_async, shutdown_pool, HashPoolBusy
 from datetime import datetime
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Optional
+import queries
+import summaries
+import gpa
+import analytics
+import bulk
+import catalog
+import crud
+import export
+import conditional
+from serialization import FAST_RESPONSES, rows_response, fast_response, output_keys, ProfiledJSONResponse
+import metrics
+import dashboard
+import timetable
+import search
+import shards
+import group_commit
+import jobs
+import events
+from pagination import PageParams, trim_page, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
 
-# ✅ Create all DB tables
-Base.metadata.create_all(bind=engine)
+# ✅ Frontend origins allowed by CORS (comma-separated)
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3001,http://10.127.129.61:3001").split(",")
+    if origin.strip()
+]
+
+# ✅ Startup/shutdown: the schema is managed by Alembic (`alembic upgrade
+# head`), so booting a worker only builds the engine
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_engine()
+    get_replica_engines()
+    shard_engines = get_shard_engines()
+    if DB_CREATE_ALL:
+        for engine in shard_engines:
+            Base.metadata.create_all(bind=engine)
+    jobs.resume_in_background()
+    yield
+    events.bus.shutdown()
+    jobs.shutdown()
+    group_commit.shutdown()
+    shutdown_pool()
+    await dispose_async_engine()
+    dispose_engine()
 
 # ✅ FastAPI app instance
-app = FastAPI(title="College Management API")
+app = FastAPI(title="College Management API", default_response_class=ProfiledJSONResponse, lifespan=lifespan)
 
 # ✅ Allow frontend (React) to call backend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3001", "http://10.127.129.61:3001"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# ✅ Read replicas: keep a client on the primary right after it writes
+if DATABASE_REPLICA_URLS:
+    app.middleware("http")(pin_reads_after_write)
+
+# ✅ Per-route latency, SQL counts and phase timings (see /metrics)
+if metrics.METRICS_ENABLED:
+    metrics.install_sql_hooks()
+    app.add_middleware(metrics.ProfileMiddleware)
+
+# ✅ Writes for a student whose shard bucket is being moved wait (see shards.py)
+@app.exception_handler(shards.BucketMoving)
+async def bucket_moving_handler(request: Request, exc: shards.BucketMoving):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Student data is being moved, retry shortly"},
+        headers={"Retry-After": str(max(1, round(shards.SHARD_MAP_TTL)))}
+    )
+
+# ✅ An academic year with no room left for another distinct semester name
+@app.exception_handler(catalog.CalendarFull)
+async def calendar_full_handler(request: Request, exc: catalog.CalendarFull):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+# ✅ Password hashing is saturated (see hashing.HASH_MAX_PENDING)
+@app.exception_handler(HashPoolBusy)
+async def hash_pool_busy_handler(request: Request, exc: HashPoolBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# ✅ Async read endpoints take precedence over the sync ones below when enabled
+if ASYNC_DB:
+    import async_routes
+    app.include_router(async_routes.router)
+
+# -------------------------------
+# 🔹 METRICS
+# -------------------------------
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False,
+         dependencies=[Depends(get_metrics_reader)])
+def get_metrics():
+    """Prometheus text exposition"""
+    caches = {"user": user_cache.stats(), "analytics": analytics.term_cache.stats()}
+    return PlainTextResponse(metrics.render(caches, pool_stats(), events.bus.stats()), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow-requests", include_in_schema=False, dependencies=[Depends(get_metrics_reader)])
+def get_slow_requests():
+    """Most recent requests slower than SLOW_REQUEST_MS"""
+    return list(metrics.registry.recent_slow)
+
 # -------------------------------
 # 🔹 AUTHENTICATION
 # -------------------------------
@@ -37,33 +139,52 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _save_user(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+
 @app.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
-    if db.query(User).filter(User.email == user.email).first():
+    if await run_in_threadpool(_get_user_by_email, db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
-    new_user = User(
-        email=user.email,
-        full_name=user.full_name,
-        hashed_password=hashed_password
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    hashed_password = await hash_password_async(user.password)
+
+    def save(session: Session) -> CurrentUser:
+        new_user = User(
+            email=user.email,
+            full_name=user.full_name,
+            hashed_password=hashed_password
+        )
+        session.add(new_user)
+        session.flush()
+        return CurrentUser(id=new_user.id, email=new_user.email, full_name=new_user.full_name)
+
+    new_user = await group_commit.commit_async(db, save)
+    await run_in_threadpool(shards.copy_user, new_user)
     return new_user
 
 @app.post("/login", response_model=Token)
-def login(req: LoginRequest, db: Session = Depends(get_db)):
+async def login(req: LoginRequest, db: Session = Depends(get_db)):
     """Login and get JWT token"""
-    user = db.query(User).filter(User.email == req.email).first()
-    if not user or not verify_password(req.password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_email, db, req.email)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    verified, new_hash = await verify_and_update_async(req.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash uses outdated parameters (e.g. a lower bcrypt cost)
+        user.hashed_password = new_hash
+        await run_in_threadpool(_save_user, db, user)
     access_token = create_access_token({"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: CurrentUser = Depends(get_current_user)):
     """Get current logged-in user"""
     return current_user
 
@@ -73,34 +194,55 @@ def get_me(current_user: User = Depends(get_current_user)):
 
 @app.get("/academic-records", response_model=List[AcademicRecordOut])
 def get_academic_records(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    return db.query(AcademicRecord).filter(
-        AcademicRecord.student_id == current_user.id
-    ).order_by(
-        AcademicRecord.academic_year.desc(),
-        AcademicRecord.semester.desc()
-    ).all()
+    version = db.execute(queries.data_version(current_user.id)).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = db.execute(queries.academic_records_for(current_user.id, columns=queries.ACADEMIC_RECORD_COLUMNS, **page.filters())).all()
+    rows = trim_page(rows, page.limit, queries.ACADEMIC_RECORD_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(AcademicRecordOut), rows, response)
+    return rows
 
 @app.post("/academic-records", response_model=AcademicRecordOut)
 def create_academic_record(
     record: AcademicRecordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(AcademicRecord).filter(
-        AcademicRecord.student_id == current_user.id,
-        AcademicRecord.semester == record.semester,
-        AcademicRecord.academic_year == record.academic_year
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Record for this semester already exists")
-    db_record = AcademicRecord(student_id=current_user.id, **record.dict())
-    db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
-    return db_record
+    term = catalog.term(db, record.academic_year, record.semester)
+    term_id = term.id
+
+    def save(session: Session) -> int:
+        if crud.existing_record_terms(session, current_user.id, [term_id]):
+            raise HTTPException(status_code=400, detail="Record for this semester already exists")
+        summaries.record_academic_record(session, current_user.id, term_id, record.gpa, record.total_credits)
+        db_record = AcademicRecord(
+            student_id=current_user.id, term_id=term_id, **record.dict(exclude=catalog.CATALOG_FIELDS)
+        )
+        session.add(db_record)
+        session.flush()
+        return db_record.id
+
+    record_id = group_commit.commit(db, save, current_user.id)
+    created = AcademicRecordOut(id=record_id, **catalog.stored_values(record.dict(), term))
+    events.publish(current_user.id, "academic-record", created.dict())
+    return created
+
+@app.post("/academic-records/bulk", response_model=BulkResult)
+async def bulk_create_academic_records(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Load academic records from an NDJSON or CSV body"""
+    return await bulk.ingest(request, db, current_user.id, AcademicRecord, AcademicRecordCreate)
 
 # -------------------------------
 # 🔹 GRADES
@@ -108,28 +250,77 @@ def create_academic_record(
 
 @app.get("/grades", response_model=List[GradeOut])
 def get_grades(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    return db.query(Grade).filter(
-        Grade.student_id == current_user.id
-    ).order_by(
-        Grade.academic_year.desc(),
-        Grade.semester.desc(),
-        Grade.course_code
-    ).all()
+    version = db.execute(queries.data_version(current_user.id)).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = db.execute(queries.grades_for(current_user.id, columns=queries.GRADE_COLUMNS, **page.filters())).all()
+    rows = trim_page(rows, page.limit, queries.GRADE_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(GradeOut), rows, response)
+    return rows
 
 @app.post("/grades", response_model=GradeOut)
 def create_grade(
     grade: GradeCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_grade = Grade(student_id=current_user.id, **grade.dict())
-    db.add(db_grade)
-    db.commit()
-    db.refresh(db_grade)
-    return db_grade
+    term = catalog.term(db, grade.academic_year, grade.semester)
+    course = catalog.course(grade.course_code, grade.course_name)
+    term_id, course_id = term.id, course.id
+
+    def save(session: Session) -> int:
+        summaries.record_grade(session, current_user.id, course_id)
+        db_grade = Grade(
+            student_id=current_user.id, term_id=term_id, course_id=course_id,
+            **grade.dict(exclude=catalog.CATALOG_FIELDS)
+        )
+        session.add(db_grade)
+        session.flush()
+        return db_grade.id
+
+    grade_id = group_commit.commit(db, save, current_user.id)
+    analytics.invalidate_term(term_id)
+    created = GradeOut(id=grade_id, **catalog.stored_values(grade.dict(), term, course))
+    events.publish(current_user.id, "grade", created.dict())
+    return created
+
+@app.post("/grades/bulk", response_model=BulkResult)
+async def bulk_create_grades(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Load grades from an NDJSON or CSV body"""
+    return await bulk.ingest(request, db, current_user.id, Grade, GradeCreate)
+
+# -------------------------------
+# 🔹 TRANSCRIPT EXPORT
+# -------------------------------
+
+@app.get("/export/transcript")
+def export_transcript(
+    format: Literal["csv", "ndjson"] = "csv",
+    academic_year: Optional[str] = None,
+    semester: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream the current student's grades as CSV or NDJSON"""
+    body = export.stream_transcript(
+        format, student_id=current_user.id, academic_year=academic_year, semester=semester
+    )
+    return StreamingResponse(
+        body,
+        media_type=export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="transcript.{format}"'}
+    )
 
 # -------------------------------
 # 🔹 CLASS SCHEDULE
@@ -137,27 +328,246 @@ def create_grade(
 
 @app.get("/class-schedules", response_model=List[ClassScheduleOut])
 def get_class_schedules(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    return db.query(ClassSchedule).filter(
-        ClassSchedule.student_id == current_user.id
-    ).order_by(
-        ClassSchedule.day_of_week,
-        ClassSchedule.start_time
-    ).all()
+    version = db.execute(queries.data_version(current_user.id)).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = db.execute(queries.class_schedules_for(current_user.id, columns=queries.CLASS_SCHEDULE_COLUMNS, **page.filters())).all()
+    rows = trim_page(rows, page.limit, queries.CLASS_SCHEDULE_ORDER, response)
+    if FAST_RESPONSES:
+        return rows_response(output_keys(ClassScheduleOut), rows, response)
+    return rows
 
 @app.post("/class-schedules", response_model=ClassScheduleOut)
 def create_class_schedule(
     schedule: ClassScheduleCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_schedule = ClassSchedule(student_id=current_user.id, **schedule.dict())
-    db.add(db_schedule)
-    db.commit()
-    db.refresh(db_schedule)
-    return db_schedule
+    values = timetable.with_slot(schedule.dict())
+    term = catalog.term(db, schedule.academic_year, schedule.semester)
+    course = catalog.course(schedule.course_code, schedule.course_name)
+    term_id, course_id = term.id, course.id
+    slot = (values["day_index"], values["start_minute"], values["end_minute"])
+    clash = db.execute(queries.schedule_conflict(current_user.id, term_id, *slot)).first()
+    if clash:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Overlaps {clash.course_code} ({clash.day_of_week} {clash.start_time}-{clash.end_time})"
+        )
+    if schedule.room:
+        # rooms are shared by every student, on every shard
+        stmt = queries.room_conflict(schedule.room, term_id, course_id, *slot)
+        clash = next(filter(None, shards.scatter(lambda session: session.execute(stmt).first(), db)), None)
+        if clash:
+            raise HTTPException(status_code=409, detail=f"Room {schedule.room} is booked for {clash.course_code}")
+
+    def save(session: Session) -> int:
+        summaries.record_class_schedule(session, current_user.id)
+        db_schedule = ClassSchedule(
+            student_id=current_user.id, term_id=term_id, course_id=course_id,
+            **{key: value for key, value in values.items() if key not in catalog.CATALOG_FIELDS}
+        )
+        session.add(db_schedule)
+        session.flush()
+        return db_schedule.id
+
+    schedule_id = group_commit.commit(db, save, current_user.id)
+    created = ClassScheduleOut(id=schedule_id, **catalog.stored_values(values, term, course))
+    events.publish(current_user.id, "class-schedule", created.dict())
+    return created
+
+@app.post("/class-schedules/bulk", response_model=BulkResult)
+async def bulk_create_class_schedules(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Load class schedules from an NDJSON or CSV body"""
+    return await bulk.ingest(request, db, current_user.id, ClassSchedule, ClassScheduleCreate)
+
+@app.get("/class-schedules/free-slots", response_model=List[FreeSlot])
+def get_free_slots(
+    academic_year: str,
+    semester: str,
+    day_start: str = "08:00",
+    day_end: str = "20:00",
+    min_minutes: int = Query(30, ge=1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Gaps of at least min_minutes between the student's classes, Monday to Friday"""
+    try:
+        start, end = timetable.parse_minutes(day_start), timetable.parse_minutes(day_end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    term_id = catalog.find_term(db, academic_year, semester)
+    rows = db.execute(queries.term_slots_for(current_user.id, term_id)).all() if term_id else []
+    week = timetable.WeeklyTimetable(timetable.slot_of(row) for row in rows)
+    return [
+        FreeSlot(
+            day_of_week=timetable.DAYS[day],
+            start_time=timetable.format_minutes(gap_start),
+            end_time=timetable.format_minutes(gap_end),
+            minutes=gap_end - gap_start
+        )
+        for day, gap_start, gap_end in week.free_slots(start, end, min_minutes)
+    ]
+
+@app.get("/timetable/occupancy", response_model=List[RoomOccupancy])
+def get_room_occupancy(
+    day: str,
+    time: str,
+    semester: str,
+    academic_year: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Rooms and courses in session at a given day and time, with head counts.
+
+    academic_year defaults to that of the current term.
+    """
+    try:
+        day_index, minute = timetable.day_index(day), timetable.parse_minutes(time)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if academic_year is None:
+        current = catalog.current_term(db)
+        academic_year = current.academic_year if current else None
+    term_id = catalog.find_term(db, academic_year, semester)
+    if term_id is None:
+        return []
+    stmt = queries.occupancy_at(term_id, day_index, minute)
+    parts = shards.scatter(lambda session: session.execute(stmt).all(), db)
+    if len(parts) == 1:
+        return parts[0]
+    # the same class can have students on several shards
+    counts = {}
+    for room, course_code, students in (row for part in parts for row in part):
+        counts[(room, course_code)] = counts.get((room, course_code), 0) + students
+    return [
+        RoomOccupancy(room=room, course_code=course_code, students=students)
+        for (room, course_code), students in sorted(counts.items(), key=lambda item: (item[0][0] or "", item[0][1]))
+    ]
+
+# -------------------------------
+# 🔹 ANALYTICS (cohort statistics, cached per term; students only see
+#    their own percentile)
+# -------------------------------
+
+def _term_stats(db: Session, academic_year: str, semester: str):
+    if not analytics.available():
+        raise HTTPException(status_code=503, detail="Analytics needs numpy installed")
+    term_id = catalog.find_term(db, academic_year, semester)
+    if term_id is None:
+        raise HTTPException(status_code=404, detail="Unknown term")
+    return analytics.term_stats(db, term_id)
+
+@app.get("/analytics/gpa-distribution", response_model=GPADistribution)
+def get_gpa_distribution(
+    academic_year: str,
+    semester: str,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Term GPA distribution of the whole cohort (admins only)"""
+    stats = _term_stats(db, academic_year, semester)
+    return GPADistribution(academic_year=academic_year, semester=semester, **stats.distribution)
+
+@app.get("/analytics/percentile", response_model=PercentileRank)
+def get_percentile_rank(
+    academic_year: str,
+    semester: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Where the current student's term GPA falls within the cohort"""
+    stats = _term_stats(db, academic_year, semester)
+    rank = analytics.percentile_rank(stats, current_user.id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="No grades for this term")
+    return PercentileRank(
+        academic_year=academic_year,
+        semester=semester,
+        gpa=rank[0],
+        percentile=rank[1],
+        students=stats.distribution["students"]
+    )
+
+@app.get("/analytics/courses", response_model=List[CourseStats])
+def get_course_stats(
+    academic_year: str,
+    semester: str,
+    course_code: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Grade histogram and pass rate per course (admins only: a small
+    course's histogram gives away individual grades)"""
+    courses = _term_stats(db, academic_year, semester).courses
+    if course_code is not None:
+        courses = [course for course in courses if course["course_code"] == course_code]
+    return courses
+
+# -------------------------------
+# 🔹 SEARCH
+# -------------------------------
+
+def _search_page(cursor: Optional[str]) -> tuple[bool, int]:
+    """(fuzzy, offset) of the requested page; ranked results page by offset"""
+    if not cursor:
+        return False, 0
+    values = decode_cursor(cursor)
+    if len(values) != 2 or not all(isinstance(value, int) and value >= 0 for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return bool(values[0]), values[1]
+
+@app.get("/search", response_model=List[SearchResult])
+def search_directory(
+    response: Response,
+    q: str = Query(..., min_length=search.MIN_TERM_LENGTH, max_length=200),
+    kind: Optional[Literal["student", "course"]] = None,
+    fuzzy: bool = Query(True, description="Fall back to typo-tolerant matching when nothing matches exactly"),
+    limit: int = Query(search.DEFAULT_SEARCH_LIMIT, ge=1, le=search.MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = Query(None, description="Opaque token from the X-Next-Cursor header"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Students and courses ranked by relevance to `q` (name, email, course code or name).
+
+    Student results (names and emails) are for admins; other users search courses.
+    """
+    # ✅ The student directory is not public
+    admin = is_admin(current_user)
+    if kind == "student" and not admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    terms = search.search_terms(q)
+    if not terms:
+        return []
+    fuzzy_page, offset = _search_page(cursor)
+    kinds = [kind] if kind else (search.SEARCH_KINDS if admin else ["course"])
+    dialect = db.get_bind().dialect.name
+
+    def matches(fuzzy_matching: bool):
+        stmt = search.search(dialect, terms, kinds, fuzzy_matching, offset, limit + 1)
+        return db.execute(stmt).all()
+
+    rows = matches(fuzzy_page)
+    if not rows and fuzzy and not cursor:
+        fuzzy_page = True
+        rows = matches(True)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([int(fuzzy_page), offset + limit])
+    if FAST_RESPONSES:
+        return rows_response(output_keys(SearchResult), rows, response)
+    return rows
 
 # -------------------------------
 # 🔹 DASHBOARD SUMMARY
@@ -165,63 +575,153 @@ def create_class_schedule(
 
 @app.get("/academic-summary", response_model=AcademicSummary)
 def get_academic_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    latest_record = db.query(AcademicRecord).filter(
-        AcademicRecord.student_id == current_user.id
-    ).order_by(
-        AcademicRecord.academic_year.desc(),
-        AcademicRecord.semester.desc()
-    ).first()
-
-    current_gpa = latest_record.gpa if latest_record else 0.0
-    total_credits = latest_record.total_credits if latest_record else 0
-
-    active_courses = db.query(ClassSchedule).filter(
-        ClassSchedule.student_id == current_user.id,
-        ClassSchedule.academic_year == "2024-2025"  # Example: current year
-    ).count()
-
-    completed_courses = db.query(Grade).filter(
-        Grade.student_id == current_user.id
-    ).distinct(Grade.course_code).count()
-
-    return AcademicSummary(
-        current_gpa=current_gpa,
-        total_credits=total_credits,
-        active_courses=active_courses,
-        completed_courses=completed_courses
-    )
+    summary = db.execute(queries.student_summary(current_user.id)).scalars().first()
+    if summary is not None:
+        not_modified = conditional.check(request, response, current_user.id, summaries.version(summary, catalog.active_term_ids(db)))
+        if not_modified:
+            return not_modified
+    return summaries.academic_summary(db, current_user.id, summary)
 
 @app.get("/grade-summary", response_model=List[GradeSummary])
 def get_grade_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    subquery = db.query(
-        Grade.course_code,
-        func.max(Grade.created_at).label("latest_date")
-    ).filter(
-        Grade.student_id == current_user.id
-    ).group_by(Grade.course_code).subquery()
-
-    latest_grades = db.query(Grade).join(
-        subquery,
-        (Grade.course_code == subquery.c.course_code) &
-        (Grade.created_at == subquery.c.latest_date)
-    ).filter(
-        Grade.student_id == current_user.id
-    ).all()
+    version = db.execute(queries.data_version(current_user.id)).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = db.execute(queries.latest_grades_for(current_user.id, columns=queries.GRADE_SUMMARY_COLUMNS)).all()
+    if FAST_RESPONSES:
+        return rows_response(output_keys(GradeSummary), rows, response)
+    return rows
 
-    return [
-        GradeSummary(
-            course_code=grade.course_code,
-            course_name=grade.course_name,
-            latest_grade=grade.grade_letter,
-            grade_points=grade.grade_points,
-            credits=grade.credits,
-            semester=grade.semester
+@app.get("/gpa", response_model=GPAReport)
+def get_gpa(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Credit-weighted term and cumulative GPA computed from grades"""
+    version = db.execute(queries.data_version(current_user.id)).scalar()
+    not_modified = conditional.check(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = db.execute(queries.gpa_grades_for(current_user.id)).all()
+    return gpa.compute_gpa(rows)
+
+@app.get("/dashboard", response_model=Dashboard, response_model_exclude_none=True)
+def get_dashboard(
+    request: Request,
+    response: Response,
+    sections: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(dashboard.SECTIONS)),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Profile, summary, latest grades, grades and schedule in one response"""
+    wanted = dashboard.parse_sections(sections)
+    summary = None
+    if wanted != {"me"}:
+        summary = db.execute(queries.student_summary(current_user.id)).scalars().first()
+        version = summaries.version(summary, catalog.active_term_ids(db)) if "academic_summary" in wanted else (
+            summary.data_version if summary is not None else None
         )
-        for grade in latest_grades
-    ]
+        not_modified = conditional.check(request, response, current_user.id, version)
+        if not_modified:
+            return not_modified
+    content = dashboard.build(db, current_user, wanted, summary)
+    if FAST_RESPONSES:
+        return fast_response({k: v for k, v in content.items() if v is not None}, response)
+    return content
+
+# -------------------------------
+# 🔹 CHANGE FEED (server-sent events, see events.py)
+# -------------------------------
+
+@app.get("/events")
+async def stream_events(current_user: CurrentUser = Depends(get_stream_user)):
+    """New grades, academic records and class schedules of the current
+    student as they are created (text/event-stream)"""
+    try:
+        events.bus.admit(current_user.id)
+    except events.TooManyStreams as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "5"})
+    return StreamingResponse(events.bus.iterate(current_user.id), media_type="text/event-stream", headers=events.STREAM_HEADERS)
+
+@app.post("/events/ticket", response_model=StreamTicket)
+def get_event_ticket(current_user: CurrentUser = Depends(get_current_user)):
+    """Short-lived credential for `GET /events?ticket=...` (EventSource
+    cannot set an Authorization header); it opens event streams only"""
+    return {"ticket": create_event_ticket(current_user.email), "expires_in": EVENT_TICKET_SECONDS}
+
+# -------------------------------
+# 🔹 BACKGROUND JOBS (admins only, see jobs.py)
+# -------------------------------
+
+def _job_or_404(db: Session, job_id: int):
+    job = jobs.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", response_model=JobOut, status_code=202)
+def submit_job(
+    job: JobCreate,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Start a cohort-wide computation; poll GET /jobs/{id} for progress"""
+    params = job.dict(exclude_none=True, exclude={"kind"} if job.kind == "transcripts" else {"kind", "format"})
+    job_id = jobs.submit(job.kind, params, current_user.id)
+    return jobs.as_dict(_job_or_404(db, job_id))
+
+@app.get("/jobs", response_model=List[JobOut])
+def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Most recent jobs first"""
+    return [jobs.as_dict(job) for job in jobs.recent(db, limit)]
+
+@app.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(
+    job_id: int,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    return jobs.as_dict(_job_or_404(db, job_id))
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobOut)
+def cancel_job(
+    job_id: int,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Stop a job after its running chunks finish"""
+    _job_or_404(db, job_id)
+    if not jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job has already finished")
+    db.expire_all()
+    return jobs.as_dict(_job_or_404(db, job_id))
+
+@app.get("/jobs/{job_id}/files/{name}")
+def download_job_file(
+    job_id: int,
+    name: str,
+    current_user: CurrentUser = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """A file written by a gpa-report or transcripts job"""
+    result = jobs.as_dict(_job_or_404(db, job_id))["result"] or {}
+    if name not in result.get("files", []):
+        raise HTTPException(status_code=404, detail="No such file for this job")
+    return FileResponse(jobs.output_path(job_id, name), filename=name)
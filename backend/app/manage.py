@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the backend database (run from backend/app).
+
+    python manage.py rebuild-summaries
+    python manage.py export --cohort --format csv --output grades.csv
+    python manage.py export --student-id 42 --format ndjson
+    python manage.py sync-sqlite-replicas
+    python manage.py shard-status
+    python manage.py rebalance-shards --dry-run
+    python manage.py move-bucket 17 2
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, get_shard_engines, SQLALCHEMY_DATABASE_URL, DATABASE_REPLICA_URLS
+import summaries
+import export
+import shards
+
+
+def rebuild_summaries(args):
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if not shards.enabled():
+            count = summaries.rebuild(db)
+            db.commit()
+        else:
+            count = 0
+            for number, student_ids in shards.students_by_shard(db).items():
+                with Session(bind=get_shard_engines()[number]) as shard:
+                    for chunk in shards.chunks(student_ids):
+                        count += summaries.rebuild(shard, chunk)
+                    shard.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {count} student summaries in {time.perf_counter() - started:.2f}s")
+
+
+def export_transcripts(args):
+    if args.student_id is None and not args.cohort:
+        sys.exit("export: pass --student-id or --cohort")
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for chunk in export.stream_transcript(
+            args.format,
+            student_id=None if args.cohort else args.student_id,
+            academic_year=args.academic_year,
+            semester=args.semester,
+        ):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def sync_sqlite_replicas(args):
+    """Local stand-in for replication: copy the primary file over each replica"""
+    primary = make_url(SQLALCHEMY_DATABASE_URL)
+    if primary.get_backend_name() != "sqlite" or not DATABASE_REPLICA_URLS:
+        sys.exit("sync-sqlite-replicas: needs a SQLite DATABASE_URL and DATABASE_REPLICA_URLS")
+    source = sqlite3.connect(primary.database)
+    try:
+        for url in DATABASE_REPLICA_URLS:
+            replica = make_url(url)
+            if replica.get_backend_name() != "sqlite":
+                sys.exit(f"sync-sqlite-replicas: {url} is not a SQLite URL")
+            target = sqlite3.connect(replica.database)
+            try:
+                source.backup(target)  # consistent online copy
+            finally:
+                target.close()
+            print(f"Copied {primary.database} -> {replica.database}")
+    finally:
+        source.close()
+
+
+def shard_status(args):
+    if not shards.enabled():
+        sys.exit("shard-status: set DATABASE_SHARD_URLS")
+    print(f"{'shard':>5} {'buckets':>8} {'students':>9} {'moving':>7}")
+    for row in shards.status():
+        print(f"{row['shard']:>5} {row['buckets']:>8} {row['students']:>9} {row['moving']:>7}")
+
+
+def move_buckets(moves, wait: float):
+    for bucket, source, target in moves:
+        started = time.perf_counter()
+        rows = shards.move_bucket(bucket, target, wait=wait)
+        print(f"Moved bucket {bucket} ({source} -> {target}): {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+def rebalance_shards(args):
+    if not shards.enabled():
+        sys.exit("rebalance-shards: set DATABASE_SHARD_URLS")
+    moves = shards.plan_rebalance()
+    if args.dry_run or not moves:
+        for bucket, source, target in moves:
+            print(f"bucket {bucket}: {source} -> {target}")
+        print(f"{len(moves)} buckets to move")
+        return
+    move_buckets(moves, args.wait)
+
+
+def move_bucket(args):
+    if not shards.enabled():
+        sys.exit("move-bucket: set DATABASE_SHARD_URLS")
+    move_buckets([(args.bucket, shards.bucket_map().get(args.bucket, shards.Location(0, None)).shard, args.shard)],
+                 args.wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-summaries", help="recompute every student summary from the base tables")
+    rebuild.set_defaults(func=rebuild_summaries)
+
+    dump = commands.add_parser("export", help="stream grade transcripts as CSV or NDJSON")
+    dump.add_argument("--format", choices=sorted(export.FORMATS), default="csv")
+    dump.add_argument("--student-id", type=int)
+    dump.add_argument("--cohort", action="store_true", help="every student in one ordered pass")
+    dump.add_argument("--academic-year")
+    dump.add_argument("--semester")
+    dump.add_argument("--output", help="file to write (default: stdout)")
+    dump.set_defaults(func=export_transcripts)
+
+    sync = commands.add_parser("sync-sqlite-replicas", help="copy the SQLite primary to every replica file")
+    sync.set_defaults(func=sync_sqlite_replicas)
+
+    wait = dict(type=float, default=shards.SHARD_MAP_TTL,
+                help="seconds for every worker to see a map change (SHARD_MAP_TTL)")
+    status = commands.add_parser("shard-status", help="buckets and students per shard")
+    status.set_defaults(func=shard_status)
+
+    rebalance = commands.add_parser("rebalance-shards", help="move buckets until every shard has an even share")
+    rebalance.add_argument("--dry-run", action="store_true", help="only print the moves")
+    rebalance.add_argument("--wait", **wait)
+    rebalance.set_defaults(func=rebalance_shards)
+
+    move = commands.add_parser("move-bucket", help="move one bucket of students to another shard")
+    move.add_argument("bucket", type=int)
+    move.add_argument("shard", type=int)
+    move.add_argument("--wait", **wait)
+    move.set_defaults(func=move_bucket)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy.engine import Engine
+
+# ✅ Per-request profiling
+#
+# A RequestStats object lives in a context variable for the duration of each
+# request; timed() sections and the SQLAlchemy cursor hooks add to it, and
+# the middleware folds it into process-wide histograms when the response is
+# ready. Exposed in Prometheus text format on /metrics.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# Test mode: raise when a request issues more SQL statements than allowed
+STRICT_QUERY_BUDGETS = os.getenv("STRICT_QUERY_BUDGETS", "0") == "1"
+MAX_QUERIES_PER_REQUEST = int(os.getenv("MAX_QUERIES_PER_REQUEST", "10"))
+# Long-lived text/event-stream responses are not profiled: BaseHTTPMiddleware
+# would sit between the stream and the client for its whole life
+UNPROFILED_PATHS = {"/events"}
+
+# Tighter per-route budgets; a lazy-loaded relationship (e.g. User.grades in
+# a loop) blows straight through these.
+QUERY_BUDGETS = {
+    ("GET", "/me"): 1,
+    ("GET", "/academic-records"): 3,
+    ("GET", "/grades"): 3,
+    ("GET", "/class-schedules"): 3,
+    ("GET", "/academic-summary"): 4,
+    ("GET", "/grade-summary"): 3,
+    ("GET", "/gpa"): 3,
+    ("GET", "/dashboard"): 7,
+    # a student's first write also builds their summary row, and the first
+    # use of a term or course adds it to the catalogue
+    ("POST", "/academic-records"): 16,
+    ("POST", "/grades"): 16,
+    ("POST", "/class-schedules"): 18,
+    # statements scale with the upload size (a few per chunk)
+    ("POST", "/grades/bulk"): None,
+    ("POST", "/academic-records/bulk"): None,
+    ("POST", "/class-schedules/bulk"): None,
+}
+# With shards (DATABASE_SHARD_URLS, see shards.py) any request may reload the
+# shard map, and each extra shard adds up to two statements (cross-shard
+# reads, copying a new term or course)
+EXTRA_SHARDS = len([url for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()])
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+GROUP_COMMIT_BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+# "pool" is time spent waiting for a database connection
+PHASES = ("auth", "bcrypt", "pool", "sql", "serialization")
+
+logger = logging.getLogger("college.slow_requests")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "phases")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the wall time of the block to the current request's phase"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[phase] += time.perf_counter() - started
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.queries: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.phase_seconds: dict[tuple[str, str, str], float] = {}
+        self.pool_wait: dict[tuple[str], Histogram] = {}
+        self.group_commit: dict[tuple[str], Histogram] = {}
+        self.slow = 0
+        self.recent_slow: deque = deque(maxlen=100)
+
+    def record(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.sql_count)
+            self.responses[key + (status,)] = self.responses.get(key + (status,), 0) + 1
+            for phase, seconds in stats.phases.items():
+                self.phase_seconds[key + (phase,)] = self.phase_seconds.get(key + (phase,), 0.0) + seconds
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            entry = {
+                "method": method,
+                "route": route,
+                "status": status,
+                "ms": round(elapsed * 1000, 1),
+                "sql_statements": stats.sql_count,
+                **{f"{phase}_ms": round(seconds * 1000, 1) for phase, seconds in stats.phases.items()},
+            }
+            with self._lock:
+                self.slow += 1
+                self.recent_slow.append(entry)
+            logger.warning("slow request %s", entry)
+
+
+registry = Registry()
+
+
+def observe_pool_wait(pool: str, seconds: float):
+    """Connection checkout time, called by the engine's pool (database.py)"""
+    with registry._lock:
+        registry.pool_wait.setdefault((pool,), Histogram(POOL_WAIT_BUCKETS)).observe(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.phases["pool"] += seconds
+
+
+def observe_group_commit(database: str, writes: int):
+    """Writes committed together, called by the group-commit writer (group_commit.py)"""
+    with registry._lock:
+        registry.group_commit.setdefault((database,), Histogram(GROUP_COMMIT_BATCH_BUCKETS)).observe(writes)
+
+
+def check_budget(method: str, route: str, stats: RequestStats):
+    budget = QUERY_BUDGETS.get((method, route), MAX_QUERIES_PER_REQUEST)
+    if budget is not None and EXTRA_SHARDS:
+        budget += 1 + 2 * EXTRA_SHARDS
+    if budget is not None and stats.sql_count > budget:
+        raise QueryBudgetExceeded(f"{method} {route} issued {stats.sql_count} SQL statements (budget {budget})")
+
+
+# ✅ SQL counters: registered on the Engine class so the sync engine and the
+# async engine (a sync engine underneath) are both covered
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.phases["sql"] += time.perf_counter() - started
+
+
+def install_sql_hooks():
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(request) -> str:
+    """Route template (bounded label set), not the raw path"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+async def profile_request(request, call_next):
+    """HTTP middleware: time the request and record its stats.
+
+    For streaming responses only the time to the first byte is covered.
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        registry.record(request.method, route_label(request), 500, time.perf_counter() - started, stats)
+        raise
+    finally:
+        _current.reset(token)
+    route = route_label(request)
+    registry.record(request.method, route, response.status_code, time.perf_counter() - started, stats)
+    if STRICT_QUERY_BUDGETS:
+        check_budget(request.method, route, stats)
+    return response
+
+
+class ProfileMiddleware:
+    """profile_request for every HTTP request except UNPROFILED_PATHS"""
+
+    def __init__(self, app):
+        self.app = app
+        self.profiled = BaseHTTPMiddleware(app, dispatch=profile_request)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in UNPROFILED_PATHS:
+            await self.profiled(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def _labels(**values) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in values.items()) + "}"
+
+
+def _histogram_lines(name: str, histograms: dict, lines: list[str], keys=("method", "route")):
+    for key, hist in sorted(histograms.items()):
+        labels = dict(zip(keys, key))
+        cumulative = 0
+        for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {hist.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+
+def render(caches: dict | None = None, pools: dict | None = None, streams: dict | None = None) -> str:
+    """Prometheus text exposition of everything recorded so far"""
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with registry._lock:
+        _histogram_lines("http_request_duration_seconds", registry.latency, lines)
+        lines += [
+            "# HELP http_request_sql_statements SQL statements issued per request",
+            "# TYPE http_request_sql_statements histogram",
+        ]
+        _histogram_lines("http_request_sql_statements", registry.queries, lines)
+        lines += ["# HELP http_requests_total Responses by route and status", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(registry.responses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+        lines += [
+            "# HELP http_request_phase_seconds_total Time spent in auth, bcrypt, SQL and serialization",
+            "# TYPE http_request_phase_seconds_total counter",
+        ]
+        for (method, route, phase), seconds in sorted(registry.phase_seconds.items()):
+            lines.append(f"http_request_phase_seconds_total{_labels(method=method, route=route, phase=phase)} {seconds}")
+        lines += [
+            "# HELP http_slow_requests_total Requests slower than SLOW_REQUEST_MS",
+            "# TYPE http_slow_requests_total counter",
+            f"http_slow_requests_total {registry.slow}",
+            "# HELP db_pool_checkout_wait_seconds Time to check a connection out of the pool",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        _histogram_lines("db_pool_checkout_wait_seconds", registry.pool_wait, lines, keys=("pool",))
+        if registry.group_commit:
+            lines += [
+                "# HELP db_group_commit_batch_size Writes committed in one group-commit transaction",
+                "# TYPE db_group_commit_batch_size histogram",
+            ]
+            _histogram_lines("db_group_commit_batch_size", registry.group_commit, lines, keys=("database",))
+    for field in ("size", "checked_out", "idle", "overflow") if pools else ():
+        lines.append(f"# TYPE db_pool_{field} gauge")
+        lines += [f"db_pool_{field}{_labels(pool=name)} {stats[field]}" for name, stats in pools.items()]
+    if streams:
+        lines += ["# TYPE sse_streams gauge", f"sse_streams {streams['streams']}",
+                  "# TYPE sse_events_sent_total counter", f"sse_events_sent_total {streams['sent']}",
+                  "# HELP sse_events_dropped_total Events dropped for clients too far behind (sent a resync)",
+                  "# TYPE sse_events_dropped_total counter", f"sse_events_dropped_total {streams['dropped']}"]
+    for name, stats in (caches or {}).items():
+        lines += [f"# TYPE cache_{name}_hits_total counter", f"cache_{name}_hits_total {stats['hits']}",
+                  f"# TYPE cache_{name}_misses_total counter", f"cache_{name}_misses_total {stats['misses']}",
+                  f"# TYPE cache_{name}_entries gauge", f"cache_{name}_entries {stats['size']}"]
+    return "\n".join(lines) + "\n"
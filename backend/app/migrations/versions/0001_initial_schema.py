@@ -0,0 +1,76 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Matches the tables previously created by Base.metadata.create_all. Existing
+databases created that way should be stamped with ``alembic stamp 0001``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String(100)),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "academic_records",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("academic_year", sa.String(20)),
+        sa.Column("semester", sa.String(20)),
+        sa.Column("gpa", sa.Float()),
+        sa.Column("total_credits", sa.Integer()),
+    )
+    op.create_index("ix_academic_records_id", "academic_records", ["id"])
+
+    op.create_table(
+        "grades",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("course_code", sa.String(20)),
+        sa.Column("course_name", sa.String(100)),
+        sa.Column("grade_letter", sa.String(5)),
+        sa.Column("grade_points", sa.Float()),
+        sa.Column("credits", sa.Integer()),
+        sa.Column("semester", sa.String(20)),
+        sa.Column("academic_year", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_grades_id", "grades", ["id"])
+
+    op.create_table(
+        "class_schedules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("course_code", sa.String(20)),
+        sa.Column("course_name", sa.String(100)),
+        sa.Column("day_of_week", sa.String(20)),
+        sa.Column("start_time", sa.String(10)),
+        sa.Column("end_time", sa.String(10)),
+        sa.Column("academic_year", sa.String(20)),
+        sa.Column("semester", sa.String(20)),
+    )
+    op.create_index("ix_class_schedules_id", "class_schedules", ["id"])
+
+
+def downgrade():
+    op.drop_table("class_schedules")
+    op.drop_table("grades")
+    op.drop_table("academic_records")
+    op.drop_table("users")
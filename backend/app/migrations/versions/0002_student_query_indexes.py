@@ -0,0 +1,40 @@
+"""composite indexes for per-student queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_academic_records_student_term", "academic_records",
+        ["student_id", "academic_year", "semester"],
+    )
+    op.create_index(
+        "ix_grades_student_term_course", "grades",
+        ["student_id", sa.text("academic_year DESC"), sa.text("semester DESC"), "course_code"],
+    )
+    op.create_index(
+        "ix_grades_student_course_created", "grades",
+        ["student_id", "course_code", "created_at"],
+    )
+    op.create_index(
+        "ix_class_schedules_student_day_start", "class_schedules",
+        ["student_id", "day_of_week", "start_time"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_class_schedules_student_day_start", table_name="class_schedules")
+    op.drop_index("ix_grades_student_course_created", table_name="grades")
+    op.drop_index("ix_grades_student_term_course", table_name="grades")
+    op.drop_index("ix_academic_records_student_term", table_name="academic_records")
@@ -0,0 +1,34 @@
+"""per-student summary table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Rows are created on the next write for each student; run
+``python manage.py rebuild-summaries`` to populate them all at once.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_summaries",
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("current_gpa", sa.Float(), nullable=False),
+        sa.Column("total_credits", sa.Integer(), nullable=False),
+        sa.Column("latest_academic_year", sa.String(20)),
+        sa.Column("latest_semester", sa.String(20)),
+        sa.Column("active_courses", sa.Integer(), nullable=False),
+        sa.Column("completed_courses", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("student_summaries")
@@ -0,0 +1,30 @@
+"""index for the latest-grade-per-course window query
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("ix_grades_student_course_created", table_name="grades")
+    op.create_index(
+        "ix_grades_student_course_latest", "grades",
+        ["student_id", "course_code", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_grades_student_course_latest", table_name="grades")
+    op.create_index(
+        "ix_grades_student_course_created", "grades",
+        ["student_id", "course_code", "created_at"],
+    )
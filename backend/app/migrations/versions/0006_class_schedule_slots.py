@@ -0,0 +1,98 @@
+"""numeric day/minute slots and room for class schedules
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Backfills day_index/start_minute/end_minute from the existing strings;
+rows whose strings cannot be parsed are left NULL. The parsing is copied
+here (as of this revision) so later changes to the app cannot change
+what this migration does.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAY_INDEX = {**{name: i for i, name in enumerate(DAYS)}, **{name[:3]: i for i, name in enumerate(DAYS)}}
+
+
+def _day_index(name: str) -> int:
+    try:
+        return DAY_INDEX[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"unknown day of week: {name!r}")
+
+
+def _minutes(value: str) -> int:
+    """'09:30' -> 570"""
+    hours, minutes = (int(part) for part in value.strip().split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"time out of range: {value!r}")
+    return hours * 60 + minutes
+
+
+def upgrade():
+    with op.batch_alter_table("class_schedules") as batch:
+        batch.add_column(sa.Column("room", sa.String(50)))
+        batch.add_column(sa.Column("day_index", sa.Integer()))
+        batch.add_column(sa.Column("start_minute", sa.Integer()))
+        batch.add_column(sa.Column("end_minute", sa.Integer()))
+
+    schedules = sa.table(
+        "class_schedules",
+        sa.column("id", sa.Integer()),
+        sa.column("day_of_week", sa.String()),
+        sa.column("start_time", sa.String()),
+        sa.column("end_time", sa.String()),
+        sa.column("day_index", sa.Integer()),
+        sa.column("start_minute", sa.Integer()),
+        sa.column("end_minute", sa.Integer()),
+    )
+    conn = op.get_bind()
+    updates = []
+    for row in conn.execute(sa.select(schedules.c.id, schedules.c.day_of_week,
+                                      schedules.c.start_time, schedules.c.end_time)):
+        try:
+            updates.append({
+                "row_id": row.id,
+                "day": _day_index(row.day_of_week or ""),
+                "start": _minutes(row.start_time or ""),
+                "end": _minutes(row.end_time or ""),
+            })
+        except ValueError:
+            continue
+    if updates:
+        conn.execute(
+            schedules.update().where(schedules.c.id == sa.bindparam("row_id")).values(
+                day_index=sa.bindparam("day"),
+                start_minute=sa.bindparam("start"),
+                end_minute=sa.bindparam("end"),
+            ),
+            updates,
+        )
+
+    op.drop_index("ix_class_schedules_student_day_start", table_name="class_schedules")
+    op.create_index("ix_class_schedules_student_slot", "class_schedules",
+                    ["student_id", "day_index", "start_minute"])
+    op.create_index("ix_class_schedules_room_slot", "class_schedules",
+                    ["room", "day_index", "start_minute"])
+    op.create_index("ix_class_schedules_term_slot", "class_schedules",
+                    ["academic_year", "semester", "day_index", "start_minute"])
+
+
+def downgrade():
+    op.drop_index("ix_class_schedules_term_slot", table_name="class_schedules")
+    op.drop_index("ix_class_schedules_room_slot", table_name="class_schedules")
+    op.drop_index("ix_class_schedules_student_slot", table_name="class_schedules")
+    op.create_index("ix_class_schedules_student_day_start", "class_schedules",
+                    ["student_id", "day_of_week", "start_time"])
+    with op.batch_alter_table("class_schedules") as batch:
+        batch.drop_column("end_minute")
+        batch.drop_column("start_minute")
+        batch.drop_column("day_index")
+        batch.drop_column("room")
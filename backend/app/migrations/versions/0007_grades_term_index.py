@@ -0,0 +1,21 @@
+"""grades index for whole-term analytics scans
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_grades_term", "grades", ["academic_year", "semester"])
+
+
+def downgrade():
+    op.drop_index("ix_grades_term", table_name="grades")
@@ -0,0 +1,281 @@
+"""term and course catalogue tables
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+grades, class_schedules and academic_records reference terms and courses
+by integer key instead of repeating the strings on every row, and
+student_summaries keeps its latest term by id. Term ids are chronological
+ordinals, start year * 100 + rank (the scheme catalog.py used when this
+revision was written, copied here so later app changes cannot alter it).
+Spellings of the same term ("Fall 2024", "fall 2024") share one row.
+"""
+import re
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TERM_TABLES = ("academic_records", "grades", "class_schedules")
+
+TERM_SPAN = 100
+SEASONS = {
+    "fall": (10, (0, 8, 15), (0, 12, 31)),
+    "autumn": (10, (0, 8, 15), (0, 12, 31)),
+    "winter": (20, (1, 1, 1), (1, 1, 15)),
+    "spring": (30, (1, 1, 16), (1, 5, 31)),
+    "summer": (40, (1, 6, 1), (1, 8, 14)),
+}
+NUMBERED_RANK = 50
+SPARE_RANKS = range(60, TERM_SPAN)
+UNDATED_YEAR_IDS = range(1, 1000 * TERM_SPAN)
+COURSE_TABLES = ("grades", "class_schedules")
+
+terms = sa.table(
+    "terms",
+    sa.column("id", sa.Integer()),
+    sa.column("academic_year", sa.String()),
+    sa.column("semester", sa.String()),
+    sa.column("starts_on", sa.Date()),
+    sa.column("ends_on", sa.Date()),
+)
+courses = sa.table(
+    "courses",
+    sa.column("id", sa.Integer()),
+    sa.column("code", sa.String()),
+    sa.column("name", sa.String()),
+)
+
+
+def _table(name, *columns):
+    return sa.table(name, *(sa.column(column) for column in columns))
+
+
+def _lookup(column, key, value):
+    """Correlated subquery: `column` of the catalogue row whose `key` is `value`"""
+    return sa.select(column).where(key == value).scalar_subquery()
+
+
+def _year_key(academic_year):
+    match = re.match(r"\s*(\d{4})", academic_year)
+    return int(match.group(1)) if match else " ".join(academic_year.lower().split())
+
+
+def _words(semester):
+    words = re.findall(r"[a-z]+|\d+", semester.lower())
+    return [str(int(word)) if word.isdigit() else word for word in words if not (word.isdigit() and len(word) == 4)]
+
+
+def _term_key(academic_year, semester):
+    return _year_key(academic_year), " ".join(_words(semester))
+
+
+def _new_term(academic_year, semester, taken):
+    """Row for a term, or None if its year has no ordinal left"""
+    year, words = _year_key(academic_year), _words(semester)
+    season = next((word for word in words if word in SEASONS), None)
+    if isinstance(year, str):
+        candidates = UNDATED_YEAR_IDS
+    else:
+        number = next((int(word) for word in words if word.isdigit() and 1 <= int(word) <= 9), None)
+        if number is None:
+            number = next((ord(word) - ord("a") + 1 for word in words if len(word) == 1 and "a" <= word <= "i"), None)
+        if season is not None:
+            rank = SEASONS[season][0] + (number or 0)
+        else:
+            rank = NUMBERED_RANK + number if number is not None else None
+        candidates = [year * TERM_SPAN + rank for rank in ([rank] if rank else []) + list(SPARE_RANKS)]
+    ordinal = next((candidate for candidate in candidates if candidate not in taken), None)
+    if ordinal is None:
+        return None
+    starts_on = ends_on = None
+    if season is not None and not isinstance(year, str):
+        _, first, last = SEASONS[season]
+        starts_on = date(year + first[0], first[1], first[2])
+        ends_on = date(year + last[0], last[1], last[2])
+    return {"id": ordinal, "academic_year": academic_year, "semester": semester,
+            "starts_on": starts_on, "ends_on": ends_on}
+
+
+def _drop_string_indexes():
+    op.drop_index("ix_academic_records_student_term", table_name="academic_records")
+    op.drop_index("ix_grades_student_term_course", table_name="grades")
+    op.drop_index("ix_grades_student_course_latest", table_name="grades")
+    op.drop_index("ix_grades_term", table_name="grades")
+    op.drop_index("ix_class_schedules_term_slot", table_name="class_schedules")
+
+
+def _fill_catalogue(conn) -> dict:
+    """Build the catalogue; returns the term id of every (academic_year, semester) pair"""
+    pairs = set()
+    for name in TERM_TABLES:
+        table = _table(name, "academic_year", "semester")
+        pairs |= set(conn.execute(sa.select(table.c.academic_year, table.c.semester).distinct()).all())
+    rows, taken, by_key, term_ids = [], set(), {}, {}
+    for academic_year, semester in sorted(pair for pair in pairs if None not in pair):
+        key = _term_key(academic_year, semester)
+        if key not in by_key:
+            row = _new_term(academic_year, semester, taken)
+            if row is None:
+                continue
+            rows.append(row)
+            taken.add(row["id"])
+            by_key[key] = row["id"]
+        term_ids[(academic_year, semester)] = by_key[key]
+    if rows:
+        conn.execute(terms.insert(), rows)
+
+    names = {}
+    for name in COURSE_TABLES:
+        table = _table(name, "course_code", "course_name")
+        stmt = sa.select(table.c.course_code, sa.func.max(table.c.course_name)).where(
+            table.c.course_code.is_not(None)
+        ).group_by(table.c.course_code)
+        for code, course_name in conn.execute(stmt):
+            names.setdefault(code, course_name)
+    if names:
+        conn.execute(courses.insert(), [{"code": code, "name": name} for code, name in sorted(names.items())])
+    return term_ids
+
+
+def _set_term_ids(conn, table, year, semester, term, term_ids: dict):
+    """Backfill table.term from (table.year, table.semester)"""
+    if term_ids:
+        conn.execute(
+            table.update().where(
+                table.c[year] == sa.bindparam("b_year"),
+                table.c[semester] == sa.bindparam("b_semester")
+            ).values({term: sa.bindparam("b_term")}),
+            [{"b_year": y, "b_semester": s, "b_term": t} for (y, s), t in term_ids.items()]
+        )
+
+
+def upgrade():
+    op.create_table(
+        "terms",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("academic_year", sa.String(20), nullable=False),
+        sa.Column("semester", sa.String(20), nullable=False),
+        sa.Column("starts_on", sa.Date()),
+        sa.Column("ends_on", sa.Date()),
+        sa.UniqueConstraint("academic_year", "semester", name="uq_terms_year_semester"),
+    )
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(20), nullable=False, unique=True),
+        sa.Column("name", sa.String(100)),
+    )
+    conn = op.get_bind()
+    term_ids = _fill_catalogue(conn)
+
+    _drop_string_indexes()
+    for name in TERM_TABLES:
+        with op.batch_alter_table(name) as batch:
+            if name in COURSE_TABLES:
+                batch.add_column(sa.Column("course_id", sa.Integer()))
+                batch.create_foreign_key(f"fk_{name}_course_id", "courses", ["course_id"], ["id"])
+            batch.add_column(sa.Column("term_id", sa.Integer()))
+            batch.create_foreign_key(f"fk_{name}_term_id", "terms", ["term_id"], ["id"])
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.add_column(sa.Column("latest_term_id", sa.Integer()))
+        batch.create_foreign_key("fk_student_summaries_latest_term_id", "terms", ["latest_term_id"], ["id"])
+
+    for name in TERM_TABLES:
+        table = _table(name, "academic_year", "semester", "course_code", "term_id", "course_id")
+        _set_term_ids(conn, table, "academic_year", "semester", "term_id", term_ids)
+        if name in COURSE_TABLES:
+            conn.execute(table.update().values(course_id=_lookup(courses.c.id, courses.c.code, table.c.course_code)))
+    summaries = _table("student_summaries", "latest_academic_year", "latest_semester", "latest_term_id")
+    _set_term_ids(conn, summaries, "latest_academic_year", "latest_semester", "latest_term_id", term_ids)
+
+    for name in TERM_TABLES:
+        with op.batch_alter_table(name) as batch:
+            if name in COURSE_TABLES:
+                batch.drop_column("course_code")
+                batch.drop_column("course_name")
+            batch.drop_column("academic_year")
+            batch.drop_column("semester")
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.drop_column("latest_academic_year")
+        batch.drop_column("latest_semester")
+
+    op.create_index("ix_academic_records_student_term", "academic_records", ["student_id", "term_id"])
+    op.create_index(
+        "ix_grades_student_term_course", "grades",
+        ["student_id", sa.text("term_id DESC"), "course_id"],
+    )
+    op.create_index(
+        "ix_grades_student_course_latest", "grades",
+        ["student_id", "course_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_grades_term", "grades", ["term_id"])
+    op.create_index("ix_class_schedules_term_slot", "class_schedules",
+                    ["term_id", "day_index", "start_minute"])
+
+
+def downgrade():
+    _drop_string_indexes()
+    for name in TERM_TABLES:
+        with op.batch_alter_table(name) as batch:
+            if name in COURSE_TABLES:
+                batch.add_column(sa.Column("course_code", sa.String(20)))
+                batch.add_column(sa.Column("course_name", sa.String(100)))
+            batch.add_column(sa.Column("academic_year", sa.String(20)))
+            batch.add_column(sa.Column("semester", sa.String(20)))
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.add_column(sa.Column("latest_academic_year", sa.String(20)))
+        batch.add_column(sa.Column("latest_semester", sa.String(20)))
+
+    conn = op.get_bind()
+    for name in TERM_TABLES:
+        table = _table(name, "academic_year", "semester", "course_code", "course_name", "term_id", "course_id")
+        values = {
+            "academic_year": _lookup(terms.c.academic_year, terms.c.id, table.c.term_id),
+            "semester": _lookup(terms.c.semester, terms.c.id, table.c.term_id),
+        }
+        if name in COURSE_TABLES:
+            values["course_code"] = _lookup(courses.c.code, courses.c.id, table.c.course_id)
+            values["course_name"] = _lookup(courses.c.name, courses.c.id, table.c.course_id)
+        conn.execute(table.update().values(values))
+    summaries = _table("student_summaries", "latest_academic_year", "latest_semester", "latest_term_id")
+    conn.execute(summaries.update().values(
+        latest_academic_year=_lookup(terms.c.academic_year, terms.c.id, summaries.c.latest_term_id),
+        latest_semester=_lookup(terms.c.semester, terms.c.id, summaries.c.latest_term_id),
+    ))
+
+    for name in TERM_TABLES:
+        with op.batch_alter_table(name) as batch:
+            batch.drop_constraint(f"fk_{name}_term_id", type_="foreignkey")
+            batch.drop_column("term_id")
+            if name in COURSE_TABLES:
+                batch.drop_constraint(f"fk_{name}_course_id", type_="foreignkey")
+                batch.drop_column("course_id")
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.drop_constraint("fk_student_summaries_latest_term_id", type_="foreignkey")
+        batch.drop_column("latest_term_id")
+    op.drop_table("courses")
+    op.drop_table("terms")
+
+    op.create_index(
+        "ix_academic_records_student_term", "academic_records",
+        ["student_id", "academic_year", "semester"],
+    )
+    op.create_index(
+        "ix_grades_student_term_course", "grades",
+        ["student_id", sa.text("academic_year DESC"), sa.text("semester DESC"), "course_code"],
+    )
+    op.create_index(
+        "ix_grades_student_course_latest", "grades",
+        ["student_id", "course_code", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_grades_term", "grades", ["academic_year", "semester"])
+    op.create_index("ix_class_schedules_term_slot", "class_schedules",
+                    ["academic_year", "semester", "day_index", "start_minute"])
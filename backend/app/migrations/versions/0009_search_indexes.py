@@ -0,0 +1,65 @@
+"""full-text search indexes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+FTS5 tables (with sync triggers) over users and courses on SQLite, FULLTEXT
+indexes on MySQL. Existing rows are indexed here. The DDL is copied from
+search.py as of this revision, so later changes to the app cannot change
+what this migration does.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# source table -> (title column, detail column)
+SOURCES = {"users": ("full_name", "email"), "courses": ("code", "name")}
+
+
+def _sqlite_ddl(source: str, title: str, detail: str) -> list[str]:
+    fts = f"{source}_fts"
+    insert_new = f"INSERT INTO {fts}(rowid, {title}, {detail}) VALUES (new.id, new.{title}, new.{detail});"
+    delete_old = (f"INSERT INTO {fts}({fts}, rowid, {title}, {detail}) "
+                  f"VALUES ('delete', old.id, old.{title}, old.{detail});")
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({title}, {detail}, "
+        f"content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {title}, {detail} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+        # index the rows that already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        existing = set(conn.execute(sa.text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+        for source, (title, detail) in SOURCES.items():
+            if f"{source}_fts" not in existing:
+                for statement in _sqlite_ddl(source, title, detail):
+                    conn.execute(sa.text(statement))
+    elif conn.dialect.name == "mysql":
+        for source, (title, detail) in SOURCES.items():
+            op.create_index(f"ft_{source}_{title}_{detail}", source, [title, detail], mysql_prefix="FULLTEXT")
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        for source in SOURCES:
+            # dropping the FTS table does not drop the triggers on the source table
+            for trigger in ("insert", "delete", "update"):
+                conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {source}_fts_{trigger}"))
+            conn.execute(sa.text(f"DROP TABLE IF EXISTS {source}_fts"))
+    elif conn.dialect.name == "mysql":
+        for source, (title, detail) in SOURCES.items():
+            op.drop_index(f"ft_{source}_{title}_{detail}", table_name=source)
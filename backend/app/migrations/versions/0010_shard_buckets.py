@@ -0,0 +1,29 @@
+"""shard map for student data
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+Only the primary's copy is read. Buckets without a row live on shard 0.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "shard_buckets",
+        sa.Column("bucket", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("target", sa.Integer()),
+    )
+
+
+def downgrade():
+    op.drop_table("shard_buckets")
@@ -0,0 +1,29 @@
+"""drop student_summaries.active_courses
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+
+Active courses depend on the current term, which moves with the calendar,
+so they are counted when the summary is read instead of stored. After a
+downgrade the column is back at 0; run `python manage.py rebuild-summaries`
+to refill it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.drop_column("active_courses")
+
+
+def downgrade():
+    with op.batch_alter_table("student_summaries") as batch:
+        batch.add_column(sa.Column("active_courses", sa.Integer(), nullable=False, server_default="0"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime, Date, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -16,17 +16,37 @@ class User(Base):
     schedules = relationship("ClassSchedule", back_populates="student")
 
 
+class Term(Base):
+    """Academic calendar. The id is a chronological ordinal (see catalog.py)"""
+    __tablename__ = "terms"
+    __table_args__ = (UniqueConstraint("academic_year", "semester", name="uq_terms_year_semester"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    academic_year = Column(String(20), nullable=False)
+    semester = Column(String(20), nullable=False)
+    starts_on = Column(Date)
+    ends_on = Column(Date)
+
+
+class Course(Base):
+    __tablename__ = "courses"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True, nullable=False)
+    name = Column(String(100))
+
+
 class AcademicRecord(Base):
     __tablename__ = "academic_records"
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"))
-    academic_year = Column(String(20))
-    semester = Column(String(20))
+    term_id = Column(Integer, ForeignKey("terms.id"))
     gpa = Column(Float, default=0.0)
     total_credits = Column(Integer, default=0)
 
     student = relationship("User", back_populates="academic_records")
+    term = relationship("Term")
 
 
 class Grade(Base):
@@ -34,16 +54,16 @@ class Grade(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"))
-    course_code = Column(String(20))
-    course_name = Column(String(100))
+    course_id = Column(Integer, ForeignKey("courses.id"))
+    term_id = Column(Integer, ForeignKey("terms.id"))
     grade_letter = Column(String(5))
     grade_points = Column(Float)
     credits = Column(Integer)
-    semester = Column(String(20))
-    academic_year = Column(String(20))
     created_at = Column(DateTime, default=datetime.utcnow)
 
     student = relationship("User", back_populates="grades")
+    course = relationship("Course")
+    term = relationship("Term")
 
 
 class ClassSchedule(Base):
@@ -51,12 +71,88 @@ class ClassSchedule(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"))
-    course_code = Column(String(20))
-    course_name = Column(String(100))
+    course_id = Column(Integer, ForeignKey("courses.id"))
+    term_id = Column(Integer, ForeignKey("terms.id"))
     day_of_week = Column(String(20))  # e.g. Monday
     start_time = Column(String(10))   # e.g. 09:00
     end_time = Column(String(10))     # e.g. 10:30
-    academic_year = Column(String(20))
-    semester = Column(String(20))
+    room = Column(String(50))
+    # Numeric encodings of the strings above (see timetable.py)
+    day_index = Column(Integer)       # 0 = Monday
+    start_minute = Column(Integer)    # minutes after midnight
+    end_minute = Column(Integer)
 
     student = relationship("User", back_populates="schedules")
+    course = relationship("Course")
+    term = relationship("Term")
+
+
+class StudentSummary(Base):
+    """Per-student dashboard numbers, maintained by the create handlers"""
+    __tablename__ = "student_summaries"
+
+    student_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    current_gpa = Column(Float, default=0.0, nullable=False)
+    total_credits = Column(Integer, default=0, nullable=False)
+    latest_term_id = Column(Integer, ForeignKey("terms.id"))
+    completed_courses = Column(Integer, default=0, nullable=False)
+    # Bumped on every change to the student's data; feeds the read ETags
+    data_version = Column(Integer, default=0, nullable=False)
+
+
+class ShardBucket(Base):
+    """Where a bucket of students (student_id % SHARD_BUCKETS) lives; see shards.py"""
+    __tablename__ = "shard_buckets"
+
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, nullable=False)
+    # Set while the bucket is being copied to another shard (writes wait)
+    target = Column(Integer)
+
+
+class Job(Base):
+    """A background computation and its progress; see jobs.py"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    # queued, running, cancelling, cancelled, succeeded or failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    params = Column(Text)   # JSON
+    result = Column(Text)   # JSON
+    error = Column(Text)
+    chunks_total = Column(Integer, default=0, nullable=False)
+    chunks_done = Column(Integer, default=0, nullable=False)
+    submitted_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # Touched as chunks finish; a running job that stops updating was orphaned
+    heartbeat_at = Column(DateTime)
+
+
+# ✅ Composite indexes matching the per-student read paths in main.py
+# (term ids are chronological, so term order is index order)
+Index("ix_academic_records_student_term", AcademicRecord.student_id, AcademicRecord.term_id)
+Index(
+    "ix_grades_student_term_course",
+    Grade.student_id, Grade.term_id.desc(), Grade.course_id
+)
+Index(
+    "ix_grades_student_course_latest",
+    Grade.student_id, Grade.course_id, Grade.created_at.desc(), Grade.id.desc()
+)
+# ✅ Whole-term scans for the cohort analytics
+Index("ix_grades_term", Grade.term_id)
+Index(
+    "ix_class_schedules_student_slot",
+    ClassSchedule.student_id, ClassSchedule.day_index, ClassSchedule.start_minute
+)
+Index(
+    "ix_class_schedules_room_slot",
+    ClassSchedule.room, ClassSchedule.day_index, ClassSchedule.start_minute
+)
+Index(
+    "ix_class_schedules_term_slot",
+    ClassSchedule.term_id, ClassSchedule.day_index, ClassSchedule.start_minute
+)
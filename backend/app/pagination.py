@@ -0,0 +1,97 @@
+import base64
+import json
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+# ✅ Keyset (cursor) pagination for the per-student list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque token from the X-Next-Cursor header"),
+        academic_year: Optional[str] = None,
+        semester: Optional[str] = None,
+    ):
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+        self.academic_year = academic_year
+        self.semester = semester
+
+    def filters(self) -> dict:
+        """Keyword filters for queries.*_for, with one look-ahead row"""
+        return {
+            "academic_year": self.academic_year,
+            "semester": self.semester,
+            "after": self.after,
+            "limit": self.limit + 1,
+        }
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_clause(order, values, leading_bound: bool = True):
+    """Rows strictly after `values` for a mixed-direction sort key.
+
+    `order` is a list of (column, descending) pairs. Unless the caller
+    already pins the first column with an equality filter, it also gets a
+    plain range bound so the database can seek in the index instead of
+    filtering the whole student range.
+    """
+    if len(values) != len(order):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    branches = []
+    for i, (column, descending) in enumerate(order):
+        equal = [col == value for (col, _), value in zip(order[:i], values[:i])]
+        beyond = column < values[i] if descending else column > values[i]
+        branches.append(and_(*equal, beyond))
+    if not leading_bound:
+        return or_(*branches)
+    first, descending = order[0]
+    leading = first <= values[0] if descending else first >= values[0]
+    return and_(leading, or_(*branches))
+
+
+def order_by(order):
+    return [column.desc() if descending else column for column, descending in order]
+
+
+def split_page(rows, limit: int, order) -> tuple[list, str | None]:
+    """Drop the extra look-ahead row and build the cursor for the next page"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, column.key) for column, _ in order)
+
+
+def trim_page(rows, limit: int, order, response: Response):
+    """split_page, emitting the next cursor as a response header"""
+    rows, cursor = split_page(rows, limit, order)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return rows
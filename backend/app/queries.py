@@ -0,0 +1,260 @@
+from sqlalchemy import select, func, false
+from models import AcademicRecord, Grade, ClassSchedule, StudentSummary, Term, Course
+from schemas import (
+    AcademicSummary, AcademicRecordOut, GradeOut, ClassScheduleOut
+)
+from pagination import after_clause, order_by
+
+# Statements shared by the sync (Session) and async (AsyncSession) routes.
+
+
+# Sort keys double as keyset cursors, so each ends with the primary key.
+# Term ids are chronological ordinals (see catalog.py).
+ACADEMIC_RECORD_ORDER = [
+    (AcademicRecord.term_id, True),
+    (AcademicRecord.id, True),
+]
+GRADE_ORDER = [
+    (Grade.term_id, True),
+    (Grade.course_id, False),
+    (Grade.id, False),
+]
+CLASS_SCHEDULE_ORDER = [
+    (ClassSchedule.day_index, False),
+    (ClassSchedule.start_minute, False),
+    (ClassSchedule.id, False),
+]
+
+# Response fields stored in the catalogue tables rather than on each row
+CATALOG_COLUMNS = {
+    "course_code": Course.code.label("course_code"),
+    "course_name": Course.name.label("course_name"),
+    "academic_year": Term.academic_year,
+    "semester": Term.semester,
+}
+
+
+def _columns(model, schema, extra=()):
+    return [
+        CATALOG_COLUMNS[name] if name in CATALOG_COLUMNS else getattr(model, name)
+        for name in schema.__fields__
+    ] + list(extra)
+
+
+# Output columns for each list endpoint, in response-schema field order,
+# followed by any sort keys the response does not include (for the cursor)
+ACADEMIC_RECORD_COLUMNS = _columns(AcademicRecord, AcademicRecordOut, [AcademicRecord.term_id])
+GRADE_COLUMNS = _columns(Grade, GradeOut, [Grade.term_id, Grade.course_id])
+CLASS_SCHEDULE_COLUMNS = _columns(ClassSchedule, ClassScheduleOut)
+
+
+def join_catalog(stmt, model):
+    """Outer-join the term (and course) each row refers to, by primary key"""
+    stmt = stmt.outerjoin(Term, Term.id == model.term_id)
+    if hasattr(model, "course_id"):
+        stmt = stmt.outerjoin(Course, Course.id == model.course_id)
+    return stmt
+
+
+def _list_for(model, order, student_id, academic_year=None, semester=None, after=None, limit=None,
+              columns=None):
+    stmt = select(*columns) if columns else select(model)
+    if columns or academic_year is not None or semester is not None:
+        stmt = join_catalog(stmt.select_from(model), model)
+    stmt = stmt.where(model.student_id == student_id)
+    if academic_year is not None:
+        stmt = stmt.where(Term.academic_year == academic_year)
+    if semester is not None:
+        stmt = stmt.where(Term.semester == semester)
+    if after is not None:
+        stmt = stmt.where(after_clause(order, after))
+    stmt = stmt.order_by(*order_by(order))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+# ✅ Academic records, newest term first
+def academic_records_for(student_id: int, **filters):
+    return _list_for(AcademicRecord, ACADEMIC_RECORD_ORDER, student_id, **filters)
+
+
+# ✅ Grades, newest term first then by course
+def grades_for(student_id: int, **filters):
+    return _list_for(Grade, GRADE_ORDER, student_id, **filters)
+
+
+# ✅ Columns needed for GPA computation, in the grades index order
+def gpa_grades_for(student_id: int):
+    return select(
+        Grade.id,
+        Grade.course_id,
+        Grade.term_id,
+        Term.academic_year,
+        Term.semester,
+        Grade.grade_points,
+        Grade.credits,
+        Grade.created_at
+    ).select_from(Grade).outerjoin(
+        Term, Term.id == Grade.term_id
+    ).where(
+        Grade.student_id == student_id
+    ).order_by(
+        Grade.term_id.desc(),
+        Grade.course_id
+    )
+
+
+# ✅ Weekly class schedule
+def class_schedules_for(student_id: int, **filters):
+    return _list_for(ClassSchedule, CLASS_SCHEDULE_ORDER, student_id, **filters)
+
+
+# ✅ Timetable lookups (all seek on a (.., day_index, start_minute) index)
+def _slot_columns(*columns):
+    return select(*columns).select_from(ClassSchedule).outerjoin(Course, Course.id == ClassSchedule.course_id)
+
+
+def schedule_conflict(student_id: int, term_id: int, day: int, start: int, end: int):
+    """First class of the student's term overlapping [start, end) on a day"""
+    return _slot_columns(
+        ClassSchedule.id, CATALOG_COLUMNS["course_code"], ClassSchedule.day_of_week,
+        ClassSchedule.start_time, ClassSchedule.end_time
+    ).where(
+        ClassSchedule.student_id == student_id,
+        ClassSchedule.day_index == day,
+        ClassSchedule.start_minute < end,
+        ClassSchedule.end_minute > start,
+        ClassSchedule.term_id == term_id
+    ).limit(1)
+
+
+def room_conflict(room: str, term_id: int, course_id: int, day: int, start: int, end: int):
+    """A different course booked in the same room at an overlapping time"""
+    return _slot_columns(ClassSchedule.id, CATALOG_COLUMNS["course_code"]).where(
+        ClassSchedule.room == room,
+        ClassSchedule.day_index == day,
+        ClassSchedule.start_minute < end,
+        ClassSchedule.end_minute > start,
+        ClassSchedule.term_id == term_id,
+        ClassSchedule.course_id != course_id
+    ).limit(1)
+
+
+def room_bookings(rooms, term_ids):
+    """Classes booked in any of the rooms in any of the terms (one row per student)"""
+    return _slot_columns(
+        ClassSchedule.term_id, ClassSchedule.room, ClassSchedule.course_id, CATALOG_COLUMNS["course_code"],
+        ClassSchedule.day_index, ClassSchedule.start_minute, ClassSchedule.end_minute
+    ).where(
+        ClassSchedule.room.in_(list(rooms)),
+        ClassSchedule.term_id.in_(list(term_ids)),
+        ClassSchedule.day_index.is_not(None)
+    )
+
+
+def term_slots_for(student_id: int, term_id: int | None = None):
+    stmt = _slot_columns(
+        ClassSchedule.id, CATALOG_COLUMNS["course_code"], CATALOG_COLUMNS["course_name"], ClassSchedule.room,
+        ClassSchedule.day_index, ClassSchedule.start_minute, ClassSchedule.end_minute
+    ).where(
+        ClassSchedule.student_id == student_id,
+        ClassSchedule.day_index.is_not(None)
+    )
+    if term_id is not None:
+        stmt = stmt.where(ClassSchedule.term_id == term_id)
+    return stmt
+
+
+def occupancy_at(term_id: int, day: int, minute: int):
+    """Rooms and courses in session at a moment, college-wide"""
+    return _slot_columns(
+        ClassSchedule.room,
+        CATALOG_COLUMNS["course_code"],
+        func.count().label("students")
+    ).where(
+        ClassSchedule.term_id == term_id,
+        ClassSchedule.day_index == day,
+        ClassSchedule.start_minute <= minute,
+        ClassSchedule.end_minute > minute
+    ).group_by(ClassSchedule.room, ClassSchedule.course_id, Course.code)
+
+
+# ✅ Dashboard summary: one primary-key read of the maintained row
+def student_summary(student_id: int):
+    return select(StudentSummary).where(StudentSummary.student_id == student_id)
+
+
+def data_version(student_id: int):
+    return select(StudentSummary.data_version).where(StudentSummary.student_id == student_id)
+
+
+def summary_from_row(summary: StudentSummary, active_courses: int) -> AcademicSummary:
+    return AcademicSummary(
+        current_gpa=summary.current_gpa,
+        total_credits=summary.total_credits,
+        active_courses=active_courses,
+        completed_courses=summary.completed_courses
+    )
+
+
+# ✅ Fallback for students whose summary row has not been built yet
+def latest_academic_record(student_id: int):
+    return academic_records_for(student_id, limit=1)
+
+
+def active_course_count(student_id: int, term_ids: list[int]):
+    """Classes in the active terms (catalog.active_term_ids)"""
+    return select(func.count()).select_from(ClassSchedule).where(
+        ClassSchedule.student_id == student_id,
+        ClassSchedule.term_id.in_(term_ids) if term_ids else false()
+    )
+
+
+def completed_course_count(student_id: int):
+    # GROUP BY (rather than COUNT(DISTINCT)) walks the (student_id, course_id, ..)
+    # index in order instead of sorting
+    courses = select(Grade.course_id).where(
+        Grade.student_id == student_id,
+        Grade.course_id.is_not(None)
+    ).group_by(Grade.course_id).subquery()
+    return select(func.count()).select_from(courses)
+
+
+def build_academic_summary(latest_record, active_courses: int, completed_courses: int) -> AcademicSummary:
+    return AcademicSummary(
+        current_gpa=latest_record.gpa if latest_record else 0.0,
+        total_credits=latest_record.total_credits if latest_record else 0,
+        active_courses=active_courses,
+        completed_courses=completed_courses
+    )
+
+
+# ✅ Latest grade per course in a single pass (ties broken by id)
+# The window runs over the covering (student_id, course_id, created_at, id)
+# index; only the winning rows are fetched from the table.
+def latest_grades_for(student_id: int, columns=None):
+    ranked = select(
+        Grade.id,
+        func.row_number().over(
+            partition_by=Grade.course_id,
+            order_by=(Grade.created_at.desc(), Grade.id.desc())
+        ).label("rn")
+    ).where(
+        Grade.student_id == student_id
+    ).subquery()
+    stmt = select(*(columns or [Grade])).select_from(Grade).join(ranked, Grade.id == ranked.c.id)
+    if columns:
+        stmt = join_catalog(stmt, Grade)
+    return stmt.where(ranked.c.rn == 1)
+
+
+# GradeSummary fields, in order
+GRADE_SUMMARY_COLUMNS = [
+    CATALOG_COLUMNS["course_code"],
+    CATALOG_COLUMNS["course_name"],
+    Grade.grade_letter.label("latest_grade"),
+    Grade.grade_points,
+    Grade.credits,
+    Term.semester,
+]
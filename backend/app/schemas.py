@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, validator
+from datetime import datetime
+from typing import Any, Literal, Optional, List, Dict
+import timetable
 
 # ----------------------
 # AUTH / USER
@@ -20,6 +22,10 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int
+
 # ----------------------
 # ACADEMIC RECORDS
 # ----------------------
@@ -65,6 +71,18 @@ class GradeSummary(BaseModel):
     credits: int
     semester: str
 
+class TermGPA(BaseModel):
+    academic_year: str
+    semester: str
+    gpa: float
+    credits: int
+    cumulative_gpa: float
+
+class GPAReport(BaseModel):
+    cumulative_gpa: float
+    total_credits: int
+    terms: List[TermGPA]
+
 # ----------------------
 # CLASS SCHEDULE
 # ----------------------
@@ -76,15 +94,98 @@ class ClassScheduleBase(BaseModel):
     end_time: str
     academic_year: str
     semester: str
+    room: Optional[str] = None
 
 class ClassScheduleCreate(ClassScheduleBase):
-    pass
+    @validator("day_of_week")
+    def normalize_day(cls, value):
+        return timetable.DAYS[timetable.day_index(value)]
+
+    @validator("start_time", "end_time")
+    def normalize_time(cls, value):
+        return timetable.format_minutes(timetable.parse_minutes(value))
+
+    @validator("end_time")
+    def ends_after_start(cls, value, values):
+        start = values.get("start_time")
+        if start is not None and timetable.parse_minutes(value) <= timetable.parse_minutes(start):
+            raise ValueError("end_time must be after start_time")
+        return value
 
 class ClassScheduleOut(ClassScheduleBase):
     id: int
+    day_index: Optional[int] = None
+    start_minute: Optional[int] = None
+    end_minute: Optional[int] = None
     class Config:
         orm_mode = True
 
+class FreeSlot(BaseModel):
+    day_of_week: str
+    start_time: str
+    end_time: str
+    minutes: int
+
+class RoomOccupancy(BaseModel):
+    room: Optional[str]
+    course_code: str
+    students: int
+
+# ----------------------
+# ANALYTICS
+# ----------------------
+class GPABin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+class GPADistribution(BaseModel):
+    academic_year: str
+    semester: str
+    students: int
+    mean: float
+    percentiles: Dict[str, float]
+    bins: List[GPABin]
+
+class PercentileRank(BaseModel):
+    academic_year: str
+    semester: str
+    gpa: float
+    percentile: float
+    students: int
+
+class CourseStats(BaseModel):
+    course_code: str
+    course_name: str
+    students: int
+    passed: int
+    pass_rate: float
+    mean_grade_points: float
+    grades: Dict[str, int]
+
+# ----------------------
+# SEARCH
+# ----------------------
+class SearchResult(BaseModel):
+    kind: str  # "student" or "course"
+    id: int
+    title: Optional[str] = None  # full name / course code
+    detail: Optional[str] = None  # email / course name
+    score: float
+
+# ----------------------
+# BULK INGESTION
+# ----------------------
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]
+
 # ----------------------
 # DASHBOARD SUMMARY
 # ----------------------
@@ -93,3 +194,39 @@ class AcademicSummary(BaseModel):
     total_credits: int
     active_courses: int
     completed_courses: int
+
+class Dashboard(BaseModel):
+    me: Optional[UserOut] = None
+    academic_summary: Optional[AcademicSummary] = None
+    grade_summary: Optional[List[GradeSummary]] = None
+    grades: Optional[List[GradeOut]] = None
+    grades_next_cursor: Optional[str] = None
+    class_schedules: Optional[List[ClassScheduleOut]] = None
+    class_schedules_next_cursor: Optional[str] = None
+
+# ----------------------
+# BACKGROUND JOBS
+# ----------------------
+class JobCreate(BaseModel):
+    kind: Literal["rebuild-summaries", "gpa-report", "transcripts"]
+    # Inclusive student id range (default: every student)
+    from_student_id: Optional[int] = None
+    to_student_id: Optional[int] = None
+    # Transcripts only
+    academic_year: Optional[str] = None
+    semester: Optional[str] = None
+    format: Literal["csv", "ndjson"] = "csv"
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    chunks_total: int
+    chunks_done: int
+    progress: float  # 0.0 to 1.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,169 @@
+import os
+import re
+
+from sqlalchemy import Index, event, func, literal, literal_column, select, table, column, text, union_all
+from sqlalchemy.dialects.mysql import match
+
+from database import Base
+from models import User, Course
+
+# ✅ Full-text search over students (name, email) and courses (code, name)
+#
+# SQLite: an FTS5 table per source table, stored as an external-content
+# index (the text is read back from users/courses) and kept in sync by
+# triggers, so every write path, including bulk loads and the catalogue,
+# is covered. The trigram tokenizer matches any substring of three or
+# more characters, which gives prefix search, and a query whose exact
+# terms match nothing falls back to OR-ing their trigrams, which tolerates
+# typos. Results are ranked with bm25.
+#
+# MySQL: FULLTEXT indexes on the same columns, queried in boolean mode with
+# a prefix wildcard per word; the fallback is natural-language mode (any
+# word), as InnoDB has no typo-tolerant matching.
+
+SEARCH_KINDS = ("student", "course")
+# Shorter terms cannot be looked up in a trigram index
+MIN_TERM_LENGTH = 3
+DEFAULT_SEARCH_LIMIT = int(os.getenv("DEFAULT_SEARCH_LIMIT", "20"))
+MAX_SEARCH_LIMIT = 100
+# bm25 weight of the title column relative to the detail column
+TITLE_WEIGHT = 2.0
+
+# kind -> (source table, title column, detail column)
+SOURCES = {
+    "student": (User.__table__, "full_name", "email"),
+    "course": (Course.__table__, "code", "name"),
+}
+
+# Attached to the tables but only emitted on MySQL (create_all skips them elsewhere)
+FULLTEXT_INDEXES = {
+    kind: Index(
+        f"ft_{source.name}_{title}_{detail}", source.c[title], source.c[detail], mysql_prefix="FULLTEXT"
+    ).ddl_if(dialect="mysql")
+    for kind, (source, title, detail) in SOURCES.items()
+}
+
+
+def fts_name(kind: str) -> str:
+    return f"{SOURCES[kind][0].name}_fts"
+
+
+def fts_table(kind: str):
+    _, title, detail = SOURCES[kind]
+    return table(fts_name(kind), column("rowid"), column(title), column(detail))
+
+
+def is_search_object(name: str) -> bool:
+    """FTS5 tables and their shadow tables, and the FULLTEXT indexes (hidden from autogenerate)"""
+    return any(name == fts_name(kind) or name.startswith(fts_name(kind) + "_") for kind in SOURCES) or \
+        any(name == index.name for index in FULLTEXT_INDEXES.values())
+
+
+def _sqlite_ddl(kind: str) -> list[str]:
+    source, title, detail = SOURCES[kind]
+    fts = fts_name(kind)
+    insert_new = f"INSERT INTO {fts}(rowid, {title}, {detail}) VALUES (new.id, new.{title}, new.{detail});"
+    delete_old = (f"INSERT INTO {fts}({fts}, rowid, {title}, {detail}) "
+                  f"VALUES ('delete', old.id, old.{title}, old.{detail});")
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({title}, {detail}, "
+        f"content='{source.name}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {source.name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {source.name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {title}, {detail} ON {source.name} "
+        f"BEGIN {delete_old} {insert_new} END",
+        # index the rows that already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_indexes(conn):
+    """Create the search indexes (and index existing rows) if they are missing"""
+    if conn.dialect.name == "sqlite":
+        existing = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+        for kind in SOURCES:
+            if fts_name(kind) not in existing:
+                for statement in _sqlite_ddl(kind):
+                    conn.execute(text(statement))
+    elif conn.dialect.name == "mysql":
+        for index in FULLTEXT_INDEXES.values():
+            index.create(conn, checkfirst=True)
+
+
+def drop_indexes(conn):
+    if conn.dialect.name == "sqlite":
+        for kind in SOURCES:
+            # dropping the FTS table does not drop the triggers on the source table
+            for trigger in ("insert", "delete", "update"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {fts_name(kind)}_{trigger}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {fts_name(kind)}"))
+    elif conn.dialect.name == "mysql":
+        for index in FULLTEXT_INDEXES.values():
+            index.drop(conn, checkfirst=True)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_with_tables(target, connection, **kw):
+    # create_all (DB_CREATE_ALL=1, benchmarks) gets the same indexes as a migrated database
+    create_indexes(connection)
+
+
+def search_terms(q: str) -> list[str]:
+    return [term for term in q.split() if len(term) >= MIN_TERM_LENGTH]
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def fts_query(terms: list[str], fuzzy: bool = False) -> str:
+    """FTS5 query: every term as a substring, or (fuzzy) any of their trigrams"""
+    if not fuzzy:
+        return " ".join(_quote(term) for term in terms)
+    grams = dict.fromkeys(term[i:i + 3].lower() for term in terms for i in range(len(term) - 2))
+    return " OR ".join(_quote(gram) for gram in grams)
+
+
+def boolean_query(terms: list[str]) -> str:
+    """MySQL boolean-mode query: every word as a prefix (shorter words are not indexed)"""
+    words = [word for term in terms for word in re.findall(r"\w+", term) if len(word) >= MIN_TERM_LENGTH]
+    return " ".join(f"+{word}*" for word in words)
+
+
+def _sqlite_match(kind: str, terms: list[str], fuzzy: bool):
+    _, title, detail = SOURCES[kind]
+    fts = fts_table(kind)
+    name = literal_column(fts.name)
+    return select(
+        literal(kind).label("kind"),
+        fts.c.rowid.label("id"),
+        fts.c[title].label("title"),
+        fts.c[detail].label("detail"),
+        # bm25 is lower for better matches
+        (-func.bm25(name, TITLE_WEIGHT, 1.0)).label("score"),
+    ).where(name.op("MATCH")(fts_query(terms, fuzzy)))
+
+
+def _mysql_match(kind: str, terms: list[str], fuzzy: bool):
+    source, title, detail = SOURCES[kind]
+    if fuzzy:
+        score = match(source.c[title], source.c[detail], against=" ".join(terms)).in_natural_language_mode()
+    else:
+        score = match(source.c[title], source.c[detail], against=boolean_query(terms)).in_boolean_mode()
+    return select(
+        literal(kind).label("kind"),
+        source.c.id.label("id"),
+        source.c[title].label("title"),
+        source.c[detail].label("detail"),
+        score.label("score"),
+    ).where(score > 0)
+
+
+def search(dialect: str, terms: list[str], kinds=SEARCH_KINDS, fuzzy: bool = False,
+           offset: int = 0, limit: int = DEFAULT_SEARCH_LIMIT):
+    """Ranked matches of every kind, best first"""
+    build = _mysql_match if dialect == "mysql" else _sqlite_match
+    matches = union_all(*(build(kind, terms, fuzzy) for kind in kinds)).subquery()
+    return select(matches).order_by(
+        matches.c.score.desc(), matches.c.kind, matches.c.id
+    ).offset(offset).limit(limit)
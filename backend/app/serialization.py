@@ -0,0 +1,59 @@
+import json
+import os
+from typing import Any, Sequence
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from metrics import timed
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library
+    orjson = None
+
+# ✅ Fast response mode (FAST_RESPONSES=1): list endpoints select only the
+# output columns and encode the row tuples directly, skipping per-row
+# Pydantic validation.
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "0") == "1"
+
+# Headers set on the injected Response (ETag, cursor, ...) to carry over
+_PASSTHROUGH_HEADERS = ("etag", "cache-control", "vary", "x-next-cursor")
+
+
+def dumps(content: Any) -> bytes:
+    with timed("serialization"):
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class ProfiledJSONResponse(JSONResponse):
+    """Default response class; counts JSON rendering as serialization time"""
+    def render(self, content: Any) -> bytes:
+        with timed("serialization"):
+            return super().render(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def output_keys(schema) -> list[str]:
+    """Field names of an output schema, in declaration order"""
+    return list(schema.__fields__)
+
+
+def rows_to_dicts(keys: Sequence[str], rows) -> list[dict]:
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def fast_response(content: Any, response: Response) -> FastJSONResponse:
+    headers = {k: v for k, v in response.headers.items() if k in _PASSTHROUGH_HEADERS}
+    return FastJSONResponse(content, headers=headers)
+
+
+def rows_response(keys: Sequence[str], rows, response: Response) -> FastJSONResponse:
+    """Encode (already trusted) database rows without model validation"""
+    return fast_response(rows_to_dicts(keys, rows), response)
@@ -0,0 +1,310 @@
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from sqlalchemy import select, insert, delete, update, event, func
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from database import (
+    get_engine, get_shard_engines, get_async_shard_engines, ReadSessionLocal, DATABASE_SHARD_URLS
+)
+from models import User, Term, Course, AcademicRecord, Grade, ClassSchedule, StudentSummary, ShardBucket
+
+# ✅ Horizontal sharding of student data by student_id
+#
+# Students are hashed into SHARD_BUCKETS virtual buckets (student_id %
+# SHARD_BUCKETS) and the shard_buckets table on the primary maps buckets to
+# shards (no row = shard 0, the primary). Rows keyed by student_id live on
+# their student's shard; the directory (users, used for login and search)
+# and the catalogue stay on the primary. Each shard also holds a copy of
+# the catalogue and of its students' user rows (without the password), so
+# the per-student queries keep their joins.
+#
+# bind_student binds the sharded models of a request's session to the
+# student's shard, so handlers and queries.py are unchanged. Cross-student
+# reads (occupancy, room clashes, analytics, cohort export) run on every
+# shard with scatter and merge the results.
+#
+# Moving a bucket (move_bucket, rebalance): the bucket is marked with its
+# target and writes for its students answer 503 while it is copied. Every
+# worker sees a map change within SHARD_MAP_TTL, so the copy waits that
+# long after marking, and the old rows are deleted that long after the
+# switch, while stale workers may still read them.
+
+SHARD_BUCKETS = int(os.getenv("SHARD_BUCKETS", "256"))
+SHARD_MAP_TTL = float(os.getenv("SHARD_MAP_TTL", "10"))
+# Students copied per statement when moving a bucket
+MOVE_CHUNK_SIZE = 500
+
+SHARDED_MODELS = (AcademicRecord, Grade, ClassSchedule, StudentSummary)
+CATALOG_MODELS = (Term, Course)
+
+_map = TTLCache(maxsize=1, ttl=SHARD_MAP_TTL)
+_executor = None
+
+
+class BucketMoving(Exception):
+    """The student's bucket is being moved to another shard; retry shortly"""
+
+
+class Location(NamedTuple):
+    shard: int
+    target: int | None  # set while the bucket is moving
+
+
+def enabled() -> bool:
+    return bool(DATABASE_SHARD_URLS)
+
+
+def shard_count() -> int:
+    return len(DATABASE_SHARD_URLS) + 1
+
+
+def bucket_of(student_id: int) -> int:
+    return student_id % SHARD_BUCKETS
+
+
+def _load_map() -> dict[int, Location]:
+    with get_engine().connect() as conn:
+        rows = conn.execute(select(ShardBucket.bucket, ShardBucket.shard, ShardBucket.target))
+        buckets = {row.bucket: Location(row.shard, row.target) for row in rows}
+    _map.set("buckets", buckets)
+    return buckets
+
+
+def bucket_map() -> dict[int, Location]:
+    buckets = _map.get("buckets")
+    return _load_map() if buckets is None else buckets
+
+
+def locate(student_id: int) -> Location:
+    return bucket_map().get(bucket_of(student_id), Location(0, None))
+
+
+def shard_of(student_id: int) -> int:
+    return locate(student_id).shard
+
+
+# -------------------------------
+# Routing
+# -------------------------------
+
+def bind_student(session, student_id: int):
+    """Point the sharded models of a Session (or AsyncSession) at the student's shard"""
+    if not enabled():
+        return session
+    shard, target = locate(student_id)
+    if hasattr(session, "sync_session"):
+        sync_session, engine = session.sync_session, get_async_shard_engines()[shard].sync_engine
+    else:
+        sync_session, engine = session, get_shard_engines()[shard]
+    sync_session.info["shard_moving"] = target is not None
+    if shard:
+        for model in SHARDED_MODELS:
+            sync_session.bind_mapper(model, engine)
+    return session
+
+
+@event.listens_for(Session, "before_flush")
+def _block_flush_while_moving(session, flush_context, instances):
+    if session.info.get("shard_moving") and (session.new or session.dirty or session.deleted):
+        raise BucketMoving()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _block_writes_while_moving(state):
+    if state.session.info.get("shard_moving") and (state.is_insert or state.is_update or state.is_delete):
+        raise BucketMoving()
+
+
+def shard_sessions() -> list[Session]:
+    """A read session per shard (shard 0 goes through the replicas)"""
+    return [ReadSessionLocal()] + [Session(bind=engine) for engine in get_shard_engines()[1:]]
+
+
+def _run(work, session: Session):
+    try:
+        return work(session)
+    finally:
+        session.close()
+
+
+def scatter(work, db: Session | None = None) -> list:
+    """work(session) on every shard in parallel, results in shard order.
+
+    Without shards this is just [work(db)]. `db` is not used when sharded:
+    it may already be bound to one student's shard.
+    """
+    global _executor
+    if not enabled():
+        return [work(db)] if db is not None else [_run(work, ReadSessionLocal())]
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4 * shard_count(), thread_name_prefix="shard")
+    futures = [
+        # copy the context so SQL counts and timings land on the request
+        _executor.submit(contextvars.copy_context().run, _run, work, session)
+        for session in shard_sessions()
+    ]
+    return [future.result() for future in futures]
+
+
+# -------------------------------
+# Copies of the directory and catalogue on the shards
+# -------------------------------
+
+def _insert_ignore(model):
+    return insert(model).prefix_with("OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql")
+
+
+def _user_copy(user) -> dict:
+    return {"id": user.id, "email": user.email, "full_name": user.full_name, "hashed_password": ""}
+
+
+def copy_reference(model, rows: list[dict]) -> None:
+    """Add new catalogue rows (with their ids) to every other shard"""
+    if not enabled() or not rows:
+        return
+    for engine in get_shard_engines()[1:]:
+        with engine.begin() as conn:
+            conn.execute(_insert_ignore(model), rows)
+
+
+def copy_user(user) -> None:
+    """Copy a new user to their shard (and to the one their bucket is moving to)"""
+    if not enabled():
+        return
+    shard, target = locate(user.id)
+    for number in {shard, target} - {0, None}:
+        with get_shard_engines()[number].begin() as conn:
+            conn.execute(_insert_ignore(User), [_user_copy(user)])
+
+
+def forget_user(user_id: int) -> None:
+    if not enabled():
+        return
+    for engine in get_shard_engines()[1:]:
+        with engine.begin() as conn:
+            conn.execute(delete(User).where(User.id == user_id))
+
+
+def students_by_shard(db: Session) -> dict[int, list[int]]:
+    """Directory user ids grouped by the shard that holds their data"""
+    buckets = bucket_map()
+    grouped: dict[int, list[int]] = {number: [] for number in range(shard_count())}
+    for student_id in db.execute(select(User.id).order_by(User.id)).scalars():
+        grouped[buckets.get(bucket_of(student_id), Location(0, None)).shard].append(student_id)
+    return grouped
+
+
+def chunks(ids: list[int], size: int = MOVE_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# -------------------------------
+# Moving buckets between shards
+# -------------------------------
+
+def _set_bucket(conn, bucket: int, shard: int, target: int | None) -> None:
+    if conn.execute(update(ShardBucket).where(ShardBucket.bucket == bucket).values(
+            shard=shard, target=target)).rowcount == 0:
+        conn.execute(insert(ShardBucket).values(bucket=bucket, shard=shard, target=target))
+
+
+def _copy_rows(src, dst, model, student_ids: list[int]) -> int:
+    table = model.__table__
+    dst.execute(delete(table).where(table.c.student_id.in_(student_ids)))  # left by an interrupted move
+    rows = [dict(row) for row in src.execute(select(table).where(table.c.student_id.in_(student_ids))).mappings()]
+    for row in rows:
+        if model is StudentSummary:
+            # the copy must not match ETags issued for the old row
+            row["data_version"] += 1
+        else:
+            # ids are per shard; the target assigns new ones
+            del row["id"]
+    if rows:
+        dst.execute(insert(table), rows)
+    return len(rows)
+
+
+def move_bucket(bucket: int, target: int, wait: float = SHARD_MAP_TTL) -> int:
+    """Move one bucket's students to another shard; returns the rows copied"""
+    engines = get_shard_engines()
+    if not 0 <= target < len(engines):
+        raise ValueError(f"No shard {target} (configured: 0-{len(engines) - 1})")
+    source = _load_map().get(bucket, Location(0, None)).shard
+    if source == target:
+        return 0
+    primary = engines[0]
+    with primary.begin() as conn:
+        _set_bucket(conn, bucket, source, target)
+    time.sleep(wait)  # until no worker still writes to the source
+
+    with primary.connect() as directory:
+        students = list(directory.execute(
+            select(User.id, User.email, User.full_name).where(User.id % SHARD_BUCKETS == bucket).order_by(User.id)
+        ))
+        catalogue = {model: [dict(row) for row in directory.execute(select(model.__table__)).mappings()]
+                     for model in CATALOG_MODELS}
+    copied = 0
+    with engines[source].connect() as src, engines[target].begin() as dst:
+        for model, rows in catalogue.items():
+            if rows:
+                dst.execute(_insert_ignore(model), rows)
+        for chunk in chunks(students):
+            dst.execute(_insert_ignore(User), [_user_copy(user) for user in chunk])
+            ids = [user.id for user in chunk]
+            copied += sum(_copy_rows(src, dst, model, ids) for model in SHARDED_MODELS)
+
+    with primary.begin() as conn:
+        _set_bucket(conn, bucket, target, None)
+    _map.clear()
+    time.sleep(wait)  # until no worker still reads from the source
+
+    with engines[source].begin() as conn:
+        for chunk in chunks([user.id for user in students]):
+            for model in SHARDED_MODELS:
+                conn.execute(delete(model.__table__).where(model.__table__.c.student_id.in_(chunk)))
+            if source:
+                conn.execute(delete(User.__table__).where(User.__table__.c.id.in_(chunk)))
+    return copied
+
+
+def plan_rebalance() -> list[tuple[int, int, int]]:
+    """(bucket, from, to) moves that leave every shard with an even share of buckets"""
+    owners = {bucket: 0 for bucket in range(SHARD_BUCKETS)}
+    owners.update((bucket, location.shard) for bucket, location in _load_map().items())
+    count = shard_count()
+    quotas = [SHARD_BUCKETS // count + (1 if number < SHARD_BUCKETS % count else 0) for number in range(count)]
+    owned: dict[int, list[int]] = {number: [] for number in range(count)}
+    for bucket, shard in sorted(owners.items()):
+        owned.setdefault(shard, []).append(bucket)
+    # buckets over quota (or on a shard that is no longer configured) move
+    spare = [bucket for shard, buckets in owned.items()
+             for bucket in buckets[quotas[shard] if shard < count else 0:]]
+    moves = []
+    for shard in range(count):
+        while len(owned[shard]) < quotas[shard] and spare:
+            bucket = spare.pop()
+            moves.append((bucket, owners[bucket], shard))
+            owned[shard].append(bucket)
+    return moves
+
+
+def status() -> list[dict]:
+    """Buckets and directory students per shard"""
+    buckets = _load_map()
+    with get_engine().connect() as conn:
+        per_bucket = dict(conn.execute(
+            select(User.id % SHARD_BUCKETS, func.count()).group_by(User.id % SHARD_BUCKETS)
+        ).all())
+    shards = [{"shard": number, "buckets": 0, "students": 0, "moving": 0} for number in range(shard_count())]
+    for bucket in range(SHARD_BUCKETS):
+        shard, target = buckets.get(bucket, Location(0, None))
+        shards[shard]["buckets"] += 1
+        shards[shard]["students"] += per_bucket.get(bucket, 0)
+        shards[shard]["moving"] += target is not None
+    return shards
@@ -0,0 +1,138 @@
+from sqlalchemy import select, delete, insert, update, func, distinct, literal
+from sqlalchemy.orm import Session
+from models import User, AcademicRecord, Grade, StudentSummary
+from schemas import AcademicSummary
+import catalog
+import queries
+
+# The create handlers call record_* before adding the new row (the session
+# does not autoflush), so a summary that has to be built from scratch never
+# counts that row twice. Active courses depend on the date (the current
+# term changes with the calendar), so they are counted when the summary is
+# read and are part of its ETag (see version).
+
+
+def _summary_select(student_ids=None):
+    """One row per student recomputed from the base tables"""
+    ranked = select(
+        AcademicRecord.student_id,
+        AcademicRecord.gpa,
+        AcademicRecord.total_credits,
+        AcademicRecord.term_id,
+        func.row_number().over(
+            partition_by=AcademicRecord.student_id,
+            order_by=AcademicRecord.term_id.desc()
+        ).label("rn")
+    )
+    completed = select(
+        Grade.student_id, func.count(distinct(Grade.course_id)).label("n")
+    )
+    students = select(User.id)
+    if student_ids is not None:
+        ranked = ranked.where(AcademicRecord.student_id.in_(student_ids))
+        completed = completed.where(Grade.student_id.in_(student_ids))
+        students = students.where(User.id.in_(student_ids))
+
+    ranked = ranked.subquery()
+    latest = select(ranked).where(ranked.c.rn == 1).subquery()
+    completed = completed.group_by(Grade.student_id).subquery()
+    students = students.subquery()
+
+    return select(
+        students.c.id,
+        func.coalesce(latest.c.gpa, 0.0),
+        func.coalesce(latest.c.total_credits, 0),
+        latest.c.term_id,
+        func.coalesce(completed.c.n, 0),
+        literal(0),
+    ).outerjoin(
+        latest, latest.c.student_id == students.c.id
+    ).outerjoin(
+        completed, completed.c.student_id == students.c.id
+    )
+
+
+# ✅ Recompute summaries in bulk (all students, or just the given ones)
+def rebuild(db: Session, student_ids=None) -> int:
+    versions = select(StudentSummary.student_id, StudentSummary.data_version)
+    clear = delete(StudentSummary)
+    if student_ids is not None:
+        versions = versions.where(StudentSummary.student_id.in_(student_ids))
+        clear = clear.where(StudentSummary.student_id.in_(student_ids))
+    # Rebuilt rows keep counting up from their old data_version so an ETag
+    # issued before the rebuild can never match again.
+    previous = db.execute(versions).all()
+    db.execute(clear)
+    result = db.execute(
+        insert(StudentSummary).from_select(
+            [
+                StudentSummary.student_id,
+                StudentSummary.current_gpa,
+                StudentSummary.total_credits,
+                StudentSummary.latest_term_id,
+                StudentSummary.completed_courses,
+                StudentSummary.data_version,
+            ],
+            _summary_select(student_ids)
+        )
+    )
+    if previous:
+        db.execute(
+            update(StudentSummary),
+            [{"student_id": student_id, "data_version": version + 1} for student_id, version in previous]
+        )
+    return result.rowcount
+
+
+def _load(db: Session, student_id: int) -> StudentSummary:
+    stmt = select(StudentSummary).where(StudentSummary.student_id == student_id).with_for_update()
+    summary = db.execute(stmt).scalars().first()
+    if summary is None:
+        rebuild(db, [student_id])
+        summary = db.execute(stmt).scalars().first()
+    summary.data_version = StudentSummary.data_version + 1
+    return summary
+
+
+# ✅ Incremental updates, applied in the caller's transaction
+def record_grade(db: Session, student_id: int, course_id: int) -> None:
+    summary = _load(db, student_id)
+    seen = db.execute(
+        select(Grade.id).where(
+            Grade.student_id == student_id,
+            Grade.course_id == course_id
+        ).limit(1)
+    ).first()
+    if seen is None:
+        summary.completed_courses = StudentSummary.completed_courses + 1
+
+
+def record_academic_record(db: Session, student_id: int, term_id: int,
+                           gpa: float, total_credits: int) -> None:
+    summary = _load(db, student_id)
+    if summary.latest_term_id is None or term_id > summary.latest_term_id:
+        summary.current_gpa = gpa
+        summary.total_credits = total_credits
+        summary.latest_term_id = term_id
+
+
+def record_class_schedule(db: Session, student_id: int) -> None:
+    # nothing stored depends on schedules; the new version changes the ETags
+    _load(db, student_id)
+
+
+# ✅ Read side: the maintained row, or the legacy queries if it is missing
+def version(summary: StudentSummary | None, active_terms: list[int]) -> str | None:
+    """ETag version of a summary: its data_version and the active terms"""
+    if summary is None:
+        return None
+    return f"{summary.data_version}:{','.join(map(str, active_terms))}"
+
+
+def academic_summary(db: Session, student_id: int, summary: StudentSummary | None) -> AcademicSummary:
+    active_courses = db.execute(queries.active_course_count(student_id, catalog.active_term_ids(db))).scalar_one()
+    if summary is not None:
+        return queries.summary_from_row(summary, active_courses)
+    latest_record = db.execute(queries.latest_academic_record(student_id)).scalars().first()
+    completed_courses = db.execute(queries.completed_course_count(student_id)).scalar_one()
+    return queries.build_academic_summary(latest_record, active_courses, completed_courses)
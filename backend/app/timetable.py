@@ -0,0 +1,128 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, NamedTuple
+
+# ✅ Numeric encodings for the free-form ClassSchedule strings
+#
+# Days are 0 (Monday) .. 6 (Sunday), times are minutes after midnight and a
+# "week minute" is day * 1440 + minute, so a week is a single number line.
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_DAY = 24 * 60
+_DAY_LOOKUP = {name.lower(): i for i, name in enumerate(DAYS)}
+_DAY_LOOKUP.update({name[:3].lower(): i for i, name in enumerate(DAYS)})
+
+
+def day_index(name: str) -> int:
+    try:
+        return _DAY_LOOKUP[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"unknown day of week: {name!r}")
+
+
+def parse_minutes(value: str) -> int:
+    """'09:30' -> 570"""
+    try:
+        hours, minutes = value.strip().split(":")
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"time must be HH:MM, got {value!r}")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"time out of range: {value!r}")
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def week_minute(day: int, minutes: int) -> int:
+    return day * MINUTES_PER_DAY + minutes
+
+
+def with_slot(values: dict) -> dict:
+    """Add the day_index/start_minute/end_minute columns to schedule values"""
+    values["day_index"] = day_index(values["day_of_week"])
+    values["start_minute"] = parse_minutes(values["start_time"])
+    values["end_minute"] = parse_minutes(values["end_time"])
+    return values
+
+
+class Slot(NamedTuple):
+    start: int  # week minute, inclusive
+    end: int    # week minute, exclusive
+    item: Any
+
+
+class WeeklyTimetable:
+    """Non-overlapping intervals kept sorted by start.
+
+    Because the intervals never overlap, both starts and ends are sorted, so
+    conflict checks are binary searches (O(log n)).
+    """
+
+    def __init__(self, slots: Iterable[Slot] = ()):
+        self._starts: list[int] = []
+        self._slots: list[Slot] = []
+        for slot in sorted(slots, key=lambda s: s.start):
+            if self.conflict(slot.start, slot.end) is None:
+                self._insert(slot)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __iter__(self):
+        return iter(self._slots)
+
+    def conflict(self, start: int, end: int) -> Slot | None:
+        """The existing slot overlapping [start, end), if any"""
+        i = bisect_left(self._starts, start)
+        if i > 0 and self._slots[i - 1].end > start:
+            return self._slots[i - 1]
+        if i < len(self._slots) and self._slots[i].start < end:
+            return self._slots[i]
+        return None
+
+    def _insert(self, slot: Slot):
+        i = bisect_left(self._starts, slot.start)
+        self._starts.insert(i, slot.start)
+        self._slots.insert(i, slot)
+
+    def add(self, start: int, end: int, item: Any = None) -> Slot | None:
+        """Insert unless it overlaps; returns the conflicting slot otherwise"""
+        clash = self.conflict(start, end)
+        if clash is None:
+            self._insert(Slot(start, end, item))
+        return clash
+
+    def free_slots(self, day_start: int = 8 * 60, day_end: int = 20 * 60,
+                   min_length: int = 30, days: Iterable[int] = range(5)) -> list[tuple[int, int, int]]:
+        """Gaps of at least min_length minutes as (day, start, end) in day minutes"""
+        gaps = []
+        for day in days:
+            cursor = week_minute(day, day_start)
+            limit = week_minute(day, day_end)
+            i = bisect_right(self._starts, cursor) - 1
+            i = max(i, 0)
+            while cursor < limit:
+                while i < len(self._slots) and self._slots[i].end <= cursor:
+                    i += 1
+                if i < len(self._slots) and self._slots[i].start < limit:
+                    slot = self._slots[i]
+                    gap_end = max(slot.start, cursor)
+                    next_cursor = slot.end
+                else:
+                    gap_end = limit
+                    next_cursor = limit
+                if gap_end - cursor >= min_length:
+                    gaps.append((day, cursor - week_minute(day, 0), gap_end - week_minute(day, 0)))
+                cursor = next_cursor
+        return gaps
+
+
+def slot_of(row, item=None) -> Slot:
+    """Slot for a row/object with day_index, start_minute and end_minute"""
+    return Slot(
+        week_minute(row.day_index, row.start_minute),
+        week_minute(row.day_index, row.end_minute),
+        row if item is None else item,
+    )
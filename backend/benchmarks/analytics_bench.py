@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Time the cohort statistics for one term: a cold analytics.compute_term
+(bulk column load + NumPy) versus the equivalent per-course SQL aggregates,
+and a warm cached read.
+
+    python benchmarks/analytics_bench.py --students 20000 --courses 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import case, create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import User, Grade, Term, Course  # noqa: E402
+import analytics  # noqa: E402
+import catalog  # noqa: E402
+
+TERM = catalog.new_term("2024-2025", "Fall 2024")
+LETTERS = [("A", 4.0), ("B", 3.0), ("C", 2.0), ("D", 1.0), ("F", 0.0)]
+
+
+def populate(engine, students: int, courses: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"s{i}@example.edu", "hashed_password": "x"} for i in range(1, students + 1)
+        ])
+        conn.execute(insert(Term), [TERM])
+        conn.execute(insert(Course), [{"id": n, "code": f"C{n:03d}", "name": f"Course {n}"} for n in range(1, 61)])
+        rows = []
+        for student_id in range(1, students + 1):
+            for n in rng.sample(range(1, 61), courses):
+                letter, points = rng.choice(LETTERS)
+                rows.append({
+                    "student_id": student_id, "course_id": n,
+                    "grade_letter": letter, "grade_points": points, "credits": rng.choice((2, 3, 4)),
+                    "term_id": TERM["id"],
+                })
+        conn.execute(insert(Grade), rows)
+
+
+def sql_aggregates(db: Session):
+    """The same statistics as GROUP BY queries over the latest grade per course"""
+    ranked = select(
+        Grade.student_id, Grade.course_id, Grade.grade_letter, Grade.grade_points, Grade.credits,
+        func.row_number().over(
+            partition_by=(Grade.student_id, Grade.course_id),
+            order_by=(Grade.created_at.desc(), Grade.id.desc())
+        ).label("rn")
+    ).where(Grade.term_id == TERM["id"]).subquery()
+    latest = select(ranked).where(ranked.c.rn == 1).subquery()
+    db.execute(select(
+        Course.code, Course.name, func.count(), func.avg(latest.c.grade_points),
+        func.sum(case((latest.c.grade_points >= analytics.PASS_GRADE_POINTS, 1), else_=0))
+    ).join(Course, Course.id == latest.c.course_id).group_by(latest.c.course_id).order_by(Course.code)).all()
+    db.execute(select(latest.c.course_id, latest.c.grade_letter, func.count())
+               .group_by(latest.c.course_id, latest.c.grade_letter)).all()
+    gpas = select(
+        (func.sum(latest.c.grade_points * latest.c.credits) / func.sum(latest.c.credits)).label("gpa")
+    ).group_by(latest.c.student_id).subquery()
+    db.execute(select(gpas.c.gpa).order_by(gpas.c.gpa)).all()
+
+
+def timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--courses", type=int, default=8, help="courses per student")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.students, args.courses, args.seed)
+        print(f"{args.students * args.courses:,} grades in {TERM['academic_year']} {TERM['semester']}\n")
+        with Session(engine) as db:
+            print(f"SQL aggregates:         {timed(sql_aggregates, db):9.1f} ms")
+            print(f"compute_term (NumPy):   {timed(analytics.compute_term, db, TERM['id']):9.1f} ms")
+            analytics.term_stats(db, TERM["id"])
+            print(f"term_stats (cached):    {timed(analytics.term_stats, db, TERM['id']):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
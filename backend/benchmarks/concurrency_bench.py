@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Read throughput on SQLite while a bulk writer is running, for each engine
+profile in database.py ("plain": driver defaults, "tuned": WAL and pragmas).
+
+Reader threads page through a random student's grades (the /grades query)
+while one thread inserts grade batches, as a bulk upload does. Reports
+reads/s and latency with and without the writer, rows written and how many
+operations failed with "database is locked".
+
+    python benchmarks/concurrency_bench.py --students 5000 --readers 8 --duration 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import database  # noqa: E402
+from database import Base  # noqa: E402
+from models import User, Grade, Term, Course  # noqa: E402
+import catalog  # noqa: E402
+import queries  # noqa: E402
+
+TERM = catalog.new_term("2024-2025", "Fall 2024")
+COURSES = 60
+
+
+def grade_rows(rng: random.Random, students: int, count: int) -> list[dict]:
+    return [
+        {"student_id": rng.randint(1, students), "course_id": rng.randint(1, COURSES), "term_id": TERM["id"],
+         "grade_letter": "B", "grade_points": 3.0, "credits": 3}
+        for _ in range(count)
+    ]
+
+
+def populate(engine, students: int, grades: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"s{i}@example.edu", "hashed_password": "x"} for i in range(1, students + 1)
+        ])
+        conn.execute(insert(Term), [TERM])
+        conn.execute(insert(Course), [{"id": n, "code": f"C{n:03d}"} for n in range(1, COURSES + 1)])
+        conn.execute(insert(Grade), grade_rows(rng, students, students * grades))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def run_phase(engine, args, with_writer: bool) -> dict:
+    deadline = time.perf_counter() + args.duration
+    latencies: list[list[float]] = [[] for _ in range(args.readers)]
+    errors = {"read": 0, "write": 0}
+    written = [0]
+
+    def reader(n: int):
+        rng = random.Random(args.seed + n)
+        while time.perf_counter() < deadline:
+            stmt = queries.grades_for(rng.randint(1, args.students), columns=queries.GRADE_COLUMNS, limit=101)
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(stmt).all()
+            except OperationalError:
+                errors["read"] += 1
+                continue
+            latencies[n].append(time.perf_counter() - started)
+
+    def writer():
+        rng = random.Random(args.seed)
+        while time.perf_counter() < deadline:
+            rows = grade_rows(rng, args.students, args.batch)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Grade), rows)
+                written[0] += len(rows)
+            except OperationalError:
+                errors["write"] += 1
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    if with_writer:
+        threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    merged = sorted(value for values in latencies for value in values)
+    return {
+        "reads_per_s": len(merged) / args.duration,
+        "p50_ms": percentile(merged, 50) * 1000,
+        "p99_ms": percentile(merged, 99) * 1000,
+        "rows_written": written[0],
+        "read_errors": errors["read"],
+        "write_errors": errors["write"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["plain", "tuned"])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--grades", type=int, default=40, help="grades per student before the run")
+    parser.add_argument("--readers", type=int, default=8, help="reader threads")
+    parser.add_argument("--batch", type=int, default=2000, help="rows per write transaction")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per phase")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'writer':<7} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'rows written':>13} {'locked (r/w)':>13}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            engine = database.configure_engine(
+                create_engine(url, **database.engine_options(url, f"bench-{profile}", profile)), profile
+            )
+            Base.metadata.create_all(bind=engine)
+            populate(engine, args.students, args.grades, args.seed)
+            for with_writer in (False, True):
+                r = run_phase(engine, args, with_writer)
+                print(f"{profile:<8} {'yes' if with_writer else 'no':<7} {r['reads_per_s']:>9.0f} "
+                      f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rows_written']:>13,} "
+                      f"{r['read_errors']:>6}/{r['write_errors']:<6}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
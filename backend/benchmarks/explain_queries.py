@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Index verification for the per-student endpoint queries.
+
+Runs EXPLAIN on every statement in app/queries.py and exits non-zero if any of
+them falls back to a full table scan or a temporary sort.
+
+    python benchmarks/explain_queries.py                 # fresh in-memory SQLite
+    python benchmarks/explain_queries.py --url mysql+pymysql://user:pw@host/db
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from database import Base  # noqa: E402
+import models  # noqa: E402,F401
+import queries  # noqa: E402
+import analytics  # noqa: E402
+
+STUDENT_ID = 1
+TERM_ID = 202410  # Fall 2024 (see catalog.py)
+# College-wide aggregates whose GROUP BY only sorts the rows of one index
+# range (the classes in session at a moment), not the whole table
+GROUPED_RANGES = {"/timetable/occupancy"}
+
+
+def endpoint_queries() -> dict:
+    """Statement issued by each read endpoint, keyed by a readable label"""
+    return {
+        "/academic-records": queries.academic_records_for(STUDENT_ID, columns=queries.ACADEMIC_RECORD_COLUMNS),
+        "/grades": queries.grades_for(STUDENT_ID, columns=queries.GRADE_COLUMNS),
+        "/grades for a year": queries.grades_for(STUDENT_ID, columns=queries.GRADE_COLUMNS, academic_year="2024-2025"),
+        "/class-schedules": queries.class_schedules_for(STUDENT_ID, columns=queries.CLASS_SCHEDULE_COLUMNS),
+        "/class-schedules conflict check": queries.schedule_conflict(STUDENT_ID, TERM_ID, 0, 540, 600),
+        "/class-schedules room check": queries.room_conflict("B-101", TERM_ID, 1, 0, 540, 600),
+        "/class-schedules/bulk room bookings": queries.room_bookings(["B-101", "B-102"], [TERM_ID]),
+        "/class-schedules/free-slots": queries.term_slots_for(STUDENT_ID, TERM_ID),
+        "/timetable/occupancy": queries.occupancy_at(TERM_ID, 0, 570),
+        "/academic-summary": queries.student_summary(STUDENT_ID),
+        "/academic-summary latest record": queries.latest_academic_record(STUDENT_ID),
+        "/academic-summary active courses": queries.active_course_count(STUDENT_ID, [TERM_ID]),
+        "/academic-summary completed courses": queries.completed_course_count(STUDENT_ID),
+        "/grade-summary": queries.latest_grades_for(STUDENT_ID, columns=queries.GRADE_SUMMARY_COLUMNS),
+        "/gpa": queries.gpa_grades_for(STUDENT_ID),
+        "/analytics term load": analytics.term_grades(TERM_ID),
+    }
+
+
+def compile_sql(engine, stmt) -> str:
+    return str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+
+
+def sqlite_problems(conn, sql: str, grouped: bool = False) -> tuple[list[str], list[str]]:
+    plan = [row[3] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    problems = []
+    for detail in plan:
+        # "SCAN <table>" is a full scan (even when it walks a covering index);
+        # scans of materialized subqueries are fine as long as they are fed by
+        # an index search.
+        if detail.startswith("SCAN ") and not detail.startswith(("SCAN anon_", "SCAN (subquery")):
+            problems.append(detail)
+        if "USE TEMP B-TREE" in detail and not (grouped and detail.endswith("FOR GROUP BY")):
+            problems.append(detail)
+    return plan, problems
+
+
+def mysql_problems(conn, sql: str, grouped: bool = False) -> tuple[list[str], list[str]]:
+    rows = conn.execute(text("EXPLAIN " + sql)).mappings().all()
+    plan, problems = [], []
+    for row in rows:
+        line = f"{row['table']}: type={row['type']} key={row['key']} extra={row['Extra']}"
+        plan.append(line)
+        extra = row["Extra"] or ""
+        if row["type"] == "ALL" and not str(row["table"]).startswith("<derived"):
+            problems.append(line)
+        if ("Using filesort" in extra or "Using temporary" in extra) and not grouped:
+            problems.append(line)
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="database URL (default: in-memory SQLite)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if args.url == "sqlite://":
+        Base.metadata.create_all(bind=engine)
+
+    check = mysql_problems if engine.dialect.name == "mysql" else sqlite_problems
+    failed = False
+    with engine.connect() as conn:
+        for label, stmt in endpoint_queries().items():
+            plan, problems = check(conn, compile_sql(engine, stmt), label in GROUPED_RANGES)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status}] {label}")
+            for line in plan:
+                print(f"       {line}")
+            failed = failed or bool(problems)
+
+    if failed:
+        print("\nSome endpoint queries are not fully index-backed.")
+        sys.exit(1)
+    print("\nAll endpoint queries are index-backed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Bulk-load a synthetic college into a database for scaling and load tests.
+
+Writes straight to the tables with executemany batches (no HTTP, no ORM),
+then rebuilds the student summaries. Every student gets the same password
+so benchmarks/load_test.py can log in as any of them (s<N>@example.edu).
+
+    python benchmarks/generate_data.py --url sqlite:///bench.db --users 100000 --grades 40
+    python benchmarks/generate_data.py --url mysql+pymysql://user:pw@host/college --users 20000
+
+Shape of the data:
+  - students enter in one of the last TERMS, more of them in recent years,
+    and take consecutive Fall/Spring terms up to the current one
+  - ~5 courses per term from 10 departments; course level rises with the
+    term number and popular courses (Zipf weights) are picked more often
+  - grades follow a per-student ability plus noise on the usual letter
+    scale; a few courses are retaken later, and when --grades exceeds the
+    courses taken the extra grades are earlier assessments (midterms)
+  - names are drawn from common first and last names (for search)
+  - one academic record per student-term, and a non-overlapping weekly
+    timetable for students enrolled in the current term
+  - terms and courses are added to the catalogue tables (existing entries
+    are reused), so the current term follows the calendar
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, event, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import User, AcademicRecord, Grade, ClassSchedule, Term, Course  # noqa: E402
+from hashing import get_password_hash  # noqa: E402
+import catalog  # noqa: E402
+import search  # noqa: E402,F401  (create_all also builds the search indexes)
+import summaries  # noqa: E402
+import timetable  # noqa: E402
+
+PASSWORD = "password123"
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David",
+               "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+               "Wei", "Aisha", "Omar", "Priya", "Ravi", "Sofia", "Mateo", "Yuki", "Chloe", "Kwame", "Lars", "Ana"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Taylor", "Moore", "Jackson",
+              "Lee", "Perez", "Thompson", "White", "Harris", "Clark", "Nguyen", "Patel", "Kim", "Chen", "Okafor",
+              "Novak", "Ivanova", "Haddad", "Tanaka", "Silva", "Schmidt", "Rossi", "Kowalski", "Murphy"]
+DEPARTMENTS = [
+    ("CS", "Computer Science", 3), ("MATH", "Mathematics", 4), ("PHYS", "Physics", 4),
+    ("CHEM", "Chemistry", 4), ("BIO", "Biology", 4), ("ENG", "English", 3),
+    ("HIST", "History", 3), ("ECON", "Economics", 3), ("PSY", "Psychology", 3), ("ART", "Fine Arts", 2),
+]
+LEVELS = (100, 200, 300, 400)
+COURSES_PER_LEVEL = 8
+SCALE = [(4.0, "A"), (3.7, "A-"), (3.3, "B+"), (3.0, "B"), (2.7, "B-"), (2.3, "C+"),
+         (2.0, "C"), (1.7, "C-"), (1.0, "D"), (0.0, "F")]
+# (days, start) meeting patterns, 75-minute sessions
+MEETINGS = [(days, start) for days in (("Monday", "Wednesday"), ("Tuesday", "Thursday"))
+            for start in ("08:00", "09:30", "11:00", "12:30", "14:00", "15:30", "17:00")]
+
+
+def current_academic_year(today: date) -> str:
+    year = today.year if today.month >= 8 else today.year - 1
+    return f"{year}-{year + 1}"
+
+
+def build_terms(current_year: str, count: int) -> list[tuple[str, str, datetime]]:
+    """(academic_year, semester, grade date) for the last `count` terms, oldest first"""
+    last = int(current_year.split("-")[0])
+    terms = []
+    for year in range(last - count // 2, last + 1):
+        terms.append((f"{year}-{year + 1}", f"Fall {year}", datetime(year, 12, 15)))
+        terms.append((f"{year}-{year + 1}", f"Spring {year + 1}", datetime(year + 1, 5, 10)))
+    # The current academic year's Spring term has not been graded yet
+    return terms[-count - 1:-1]
+
+
+def build_catalogue() -> dict[int, list[tuple[str, str, int, float]]]:
+    """Courses per level as (code, name, credits, popularity weight)"""
+    catalogue = {level: [] for level in LEVELS}
+    for code, name, credits in DEPARTMENTS:
+        for level in LEVELS:
+            for n in range(COURSES_PER_LEVEL):
+                catalogue[level].append((f"{code}{level + n + 1}", f"{name} {level + n + 1}", credits, 1.0 / (n + 1)))
+    return catalogue
+
+
+def full_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def letter_for(points: float) -> tuple[float, str]:
+    for value, letter in SCALE:
+        if points >= value - 0.15:
+            return value, letter
+    return SCALE[-1]
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.terms = build_terms(args.current_year, args.terms)
+        self.catalogue = build_catalogue()
+        self.term_ids: dict[tuple[str, str], int] = {}
+        self.course_ids: dict[str, int] = {}
+        self.weights = {level: [c[3] for c in courses] for level, courses in self.catalogue.items()}
+        # Later entry terms are more likely (enrolment grows)
+        self.entry_weights = [1.0 + 0.15 * i for i in range(len(self.terms))]
+
+    def load_catalogue(self, conn):
+        """Add the generated terms and courses to the catalogue tables and note their ids"""
+        existing = {(row.academic_year, row.semester): row.id
+                    for row in conn.execute(select(Term.id, Term.academic_year, Term.semester))}
+        taken, rows = set(existing.values()), []
+        for year, semester, _ in self.terms:
+            if (year, semester) not in existing:
+                rows.append(catalog.new_term(year, semester, taken))
+                taken.add(rows[-1]["id"])
+                existing[(year, semester)] = rows[-1]["id"]
+        if rows:
+            conn.execute(insert(Term), rows)
+        self.term_ids = existing
+
+        codes = dict(conn.execute(select(Course.code, Course.id)).all())
+        rows = [{"code": code, "name": name}
+                for courses in self.catalogue.values() for code, name, _, _ in courses if code not in codes]
+        if rows:
+            conn.execute(insert(Course), rows)
+            codes = dict(conn.execute(select(Course.code, Course.id)).all())
+        self.course_ids = codes
+
+    def pick_course(self, term_number: int, taken: set[str]):
+        level = LEVELS[min(term_number // 2, len(LEVELS) - 1)]
+        if self.rng.random() < 0.25 and level > LEVELS[0]:
+            level -= 100  # electives below the student's year
+        courses = self.catalogue[level]
+        for _ in range(20):
+            course = self.rng.choices(courses, weights=self.weights[level])[0]
+            if course[0] not in taken:
+                return course
+        return self.rng.choice(courses)
+
+    def student(self, student_id: int):
+        """Grades, academic records and schedules for one student"""
+        rng = self.rng
+        entry = rng.choices(range(len(self.terms)), weights=self.entry_weights)[0]
+        enrolled = self.terms[entry:]
+        ability = min(4.0, max(0.5, rng.gauss(3.0, 0.5)))
+
+        # 4-6 courses per term, trimmed to the grade budget
+        taken: set[str] = set()
+        failed: list[tuple] = []
+        plan = []  # (term number, course)
+        for number in range(len(enrolled)):
+            for _ in range(rng.randint(4, 6)):
+                course = failed.pop() if failed and rng.random() < 0.5 else self.pick_course(number, taken)
+                taken.add(course[0])
+                plan.append((number, course))
+                if rng.random() < 0.06:
+                    failed.append(course)  # candidate for a retake
+        plan = plan[:self.args.grades]
+        # Grades beyond one per course are earlier assessments (midterms, quizzes)
+        assessments = [1 + self.args.grades // len(plan)] * (self.args.grades % len(plan)) + \
+            [self.args.grades // len(plan)] * (len(plan) - self.args.grades % len(plan))
+
+        grades, records, schedules = [], [], []
+        term_totals = [[0.0, 0] for _ in enrolled]
+        term_courses = [[] for _ in enrolled]
+        for (number, course), count in zip(plan, assessments):
+            year, semester, graded = enrolled[number]
+            code, _, credits, _ = course
+            for k in range(count):
+                points, letter = letter_for(min(4.0, max(0.0, rng.gauss(ability, 0.6))))
+                grades.append({
+                    "student_id": student_id, "course_id": self.course_ids[code],
+                    "grade_letter": letter, "grade_points": points, "credits": credits,
+                    "term_id": self.term_ids[(year, semester)],
+                    # the final (k = count - 1) is the most recent grade of the course
+                    "created_at": graded - timedelta(weeks=3 * (count - 1 - k), minutes=rng.randrange(0, 7 * 24 * 60)),
+                })
+            term_totals[number][0] += points * credits
+            term_totals[number][1] += credits
+            term_courses[number].append(course)
+
+        for number, (year, semester, _) in enumerate(enrolled):
+            points, credits = term_totals[number]
+            if not credits:
+                continue
+            records.append({
+                "student_id": student_id, "term_id": self.term_ids[(year, semester)],
+                "gpa": round(points / credits, 2), "total_credits": credits,
+            })
+        year, semester, _ = enrolled[-1]
+        if year == self.args.current_year and term_courses[-1]:
+            schedules = self.timetable(student_id, year, semester, term_courses[-1])
+        return grades, records, schedules
+
+    def timetable(self, student_id: int, year: str, semester: str, courses) -> list[dict]:
+        rows = []
+        for (code, _, _, _), (days, start) in zip(courses, self.rng.sample(MEETINGS, min(len(courses), len(MEETINGS)))):
+            start_minute = timetable.parse_minutes(start)
+            for day in days:
+                rows.append(timetable.with_slot({
+                    "student_id": student_id, "course_id": self.course_ids[code],
+                    "day_of_week": day, "start_time": start,
+                    "end_time": timetable.format_minutes(start_minute + 75),
+                    "term_id": self.term_ids[(year, semester)],
+                    "room": f"{code.rstrip('0123456789')}-{100 + int(code[-3:]) % 50}",
+                }))
+        return rows
+
+
+def sqlite_fast_load(engine):
+    """Relax durability for the bulk load only (the connections are discarded after)"""
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///bench.db", help="target database (tables are created if missing)")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--grades", type=int, default=40, help="grades per student")
+    parser.add_argument("--terms", type=int, default=8, help="terms of history")
+    parser.add_argument("--current-year", default=current_academic_year(date.today()),
+                        help="academic year of the current term (default: today's)")
+    parser.add_argument("--batch", type=int, default=20_000, help="rows per INSERT batch")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if engine.dialect.name == "sqlite":
+        sqlite_fast_load(engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        first_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+    hashed = get_password_hash(PASSWORD)
+    generator = Generator(args)
+    # separate stream so the names do not change the rest of the data
+    name_rng = random.Random(args.seed + 1)
+    pending = {User: [], Grade: [], AcademicRecord: [], ClassSchedule: []}
+    totals = dict.fromkeys(pending, 0)
+    started = time.perf_counter()
+
+    def flush(conn):
+        for model, rows in pending.items():
+            if rows:
+                conn.execute(insert(model), rows)
+                totals[model] += len(rows)
+                rows.clear()
+
+    with engine.begin() as conn:
+        generator.load_catalogue(conn)
+        for student_id in range(first_id, first_id + args.users):
+            pending[User].append({
+                "id": student_id, "email": f"s{student_id}@example.edu",
+                "full_name": full_name(name_rng), "hashed_password": hashed,
+            })
+            grades, records, schedules = generator.student(student_id)
+            pending[Grade] += grades
+            pending[AcademicRecord] += records
+            pending[ClassSchedule] += schedules
+            if len(pending[Grade]) >= args.batch:
+                flush(conn)
+                done = student_id - first_id + 1
+                rate = done / (time.perf_counter() - started)
+                print(f"\r  {done:,}/{args.users:,} students ({rate:,.0f}/s)", end="", flush=True)
+        flush(conn)
+    print()
+
+    summary_started = time.perf_counter()
+    with Session(engine) as db:
+        summaries.rebuild(db, list(range(first_id, first_id + args.users)) if first_id > 1 else None)
+        db.commit()
+    for model, count in totals.items():
+        print(f"{model.__tablename__:>18}: {count:,}")
+    print(f"Loaded in {summary_started - started:.1f}s, summaries in {time.perf_counter() - summary_started:.1f}s")
+    print(f"Log in as s{first_id}@example.edu .. s{first_id + args.users - 1}@example.edu / {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
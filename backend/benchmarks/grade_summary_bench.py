@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare the old GROUP BY + self-join /grade-summary query with the
+ROW_NUMBER() window version on a synthetic SQLite dataset.
+
+    python benchmarks/grade_summary_bench.py --students 20000 --grades 40
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, select, func, insert, text  # noqa: E402
+from database import Base  # noqa: E402
+from models import User, Grade, Term, Course  # noqa: E402
+import catalog  # noqa: E402
+import queries  # noqa: E402
+
+COURSES = [(f"C{n:03d}", f"Course {n}") for n in range(60)]
+TERMS = [(f"{y}-{y + 1}", f"{s} {y + (s == 'Spring')}") for y in range(2019, 2025) for s in ("Fall", "Spring")]
+
+
+def legacy_latest_grades_for(student_id: int):
+    """The previous two-pass implementation (duplicates rows on timestamp ties)"""
+    subquery = select(
+        Grade.course_id,
+        func.max(Grade.created_at).label("latest_date")
+    ).where(
+        Grade.student_id == student_id
+    ).group_by(Grade.course_id).subquery()
+
+    return select(Grade).join(
+        subquery,
+        (Grade.course_id == subquery.c.course_id) &
+        (Grade.created_at == subquery.c.latest_date)
+    ).where(
+        Grade.student_id == student_id
+    )
+
+
+def populate(engine, students: int, grades_per_student: int, seed: int):
+    rng = random.Random(seed)
+    base = datetime(2019, 9, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"s{i}@example.edu", "full_name": f"Student {i}", "hashed_password": "x"}
+            for i in range(1, students + 1)
+        ])
+        conn.execute(insert(Course), [
+            {"id": n, "code": code, "name": name} for n, (code, name) in enumerate(COURSES, start=1)
+        ])
+        terms = [catalog.new_term(year, semester) for year, semester in TERMS]
+        conn.execute(insert(Term), terms)
+        batch = []
+        for student_id in range(1, students + 1):
+            for _ in range(grades_per_student):
+                # Coarse timestamps so some grades of a course share created_at
+                created = base + timedelta(days=rng.randrange(0, 2000))
+                batch.append({
+                    "student_id": student_id, "course_id": rng.randrange(1, len(COURSES) + 1),
+                    "grade_letter": "A", "grade_points": round(rng.uniform(0, 4), 1),
+                    "credits": rng.choice((2, 3, 4)), "term_id": rng.choice(terms)["id"],
+                    "created_at": created,
+                })
+            if len(batch) >= 50_000:
+                conn.execute(insert(Grade), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(Grade), batch)
+        conn.execute(text("ANALYZE"))
+
+
+def explain(conn, engine, stmt) -> list[str]:
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+
+def run(conn, build, student_ids) -> tuple[float, int]:
+    rows = 0
+    started = time.perf_counter()
+    for student_id in student_ids:
+        rows += len(conn.execute(build(student_id)).all())
+    return time.perf_counter() - started, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--grades", type=int, default=40, help="grades per student")
+    parser.add_argument("--samples", type=int, default=500, help="students queried per variant")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        populate(engine, args.students, args.grades, args.seed)
+        print(f"Loaded {args.students * args.grades:,} grades in {time.perf_counter() - started:.1f}s\n")
+
+        sample = random.Random(args.seed).sample(range(1, args.students + 1), min(args.samples, args.students))
+        variants = {"group-by + self-join": legacy_latest_grades_for, "row_number window": queries.latest_grades_for}
+        with engine.connect() as conn:
+            for label, build in variants.items():
+                print(f"{label}:")
+                for line in explain(conn, engine, build(sample[0])):
+                    print(f"    {line}")
+                run(conn, build, sample[:20])  # warm the page cache
+                elapsed, rows = run(conn, build, sample)
+                print(f"    {len(sample)} students, {rows} rows, "
+                      f"{elapsed * 1000 / len(sample):.3f} ms/student\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Single-row writes per second with one commit per request versus group
+commit (group_commit.py), on a SQLite file for each engine profile.
+
+Client threads each insert a grade and bump the student's summary, as
+POST /grades does, and wait for their commit. Reports writes/s, latency
+and the mean batch size.
+
+    python benchmarks/group_commit_bench.py --clients 32 --writes 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import database  # noqa: E402
+from database import Base  # noqa: E402
+from models import User, Grade, Term, Course  # noqa: E402
+import catalog  # noqa: E402
+import metrics  # noqa: E402
+import summaries  # noqa: E402
+from group_commit import Coalescer  # noqa: E402
+
+TERM = catalog.new_term("2024-2025", "Fall 2024")
+STUDENTS = 1000
+COURSES = 60
+
+
+def populate(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"s{i}@example.edu", "hashed_password": "x"} for i in range(1, STUDENTS + 1)
+        ])
+        conn.execute(insert(Term), [TERM])
+        conn.execute(insert(Course), [{"id": n, "code": f"C{n:03d}"} for n in range(1, COURSES + 1)])
+    with sessionmaker(bind=engine)() as session:
+        summaries.rebuild(session)
+        session.commit()
+
+
+def grade_work(student_id: int, course_id: int):
+    def save(session) -> int:
+        summaries.record_grade(session, student_id, course_id)
+        grade = Grade(student_id=student_id, course_id=course_id, term_id=TERM["id"],
+                      grade_letter="B", grade_points=3.0, credits=3)
+        session.add(grade)
+        session.flush()
+        return grade.id
+    return save
+
+
+def run(session_factory, args, coalescer=None) -> dict:
+    latencies: list[list[float]] = [[] for _ in range(args.clients)]
+    per_client = args.writes // args.clients
+
+    def client(n: int):
+        rng = random.Random(args.seed + n)
+        for _ in range(per_client):
+            work = grade_work(rng.randint(1, STUDENTS), rng.randint(1, COURSES))
+            started = time.perf_counter()
+            if coalescer is not None:
+                coalescer.submit(work).result()
+            else:
+                with session_factory() as session:
+                    work(session)
+                    session.commit()
+            latencies[n].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    merged = sorted(value for values in latencies for value in values)
+    return {
+        "writes_per_s": len(merged) / elapsed,
+        "p50_ms": merged[len(merged) // 2] * 1000,
+        "p99_ms": merged[min(len(merged) - 1, int(len(merged) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["plain", "tuned"])
+    parser.add_argument("--clients", type=int, default=32, help="concurrent writer threads")
+    parser.add_argument("--writes", type=int, default=2000, help="writes per run")
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'mode':<13} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for profile in args.profiles:
+        for grouped in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+                engine = database.configure_engine(
+                    create_engine(url, **database.engine_options(url, f"bench-{profile}", profile)), profile
+                )
+                Base.metadata.create_all(bind=engine)
+                populate(engine)
+                factory = sessionmaker(bind=engine, autoflush=False)
+                name = f"bench-{profile}"
+                coalescer = Coalescer(factory, name, window_ms=args.window_ms) if grouped else None
+                r = run(factory, args, coalescer)
+                batch = 1.0
+                if coalescer is not None:
+                    coalescer.close()
+                    sizes = metrics.registry.group_commit[(name,)]
+                    batch = sizes.sum / sizes.count
+                mode = "group commit" if grouped else "per request"
+                print(f"{profile:<8} {mode:<13} {r['writes_per_s']:>9.0f} {r['p50_ms']:>8.2f} "
+                      f"{r['p99_ms']:>8.2f} {batch:>6.1f}")
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
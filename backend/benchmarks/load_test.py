@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Repeatable HTTP load test: throughput and p50/p95/p99 latency per endpoint.
+
+Run it against a database filled by generate_data.py, either on a server
+you started yourself or on one it spawns (uvicorn, backend/app):
+
+    python benchmarks/generate_data.py --url sqlite:///bench.db --users 100000
+    python benchmarks/load_test.py --spawn --db-url sqlite:///$PWD/bench.db --users 100000
+
+Each endpoint is driven by --concurrency workers for --duration seconds.
+Results are written to benchmarks/results/<time>_<commit>.json; pass
+--baseline (a file, or "latest") to print the change against an earlier run
+and --fail-on-regression to exit non-zero when p95 or throughput got worse
+by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(HERE, "..", "app")
+RESULTS_DIR = os.path.join(HERE, "results")
+PASSWORD = "password123"  # see generate_data.py
+ENDPOINTS = ["/login", "/me", "/academic-summary", "/grade-summary", "/grades", "/gpa",
+             "/class-schedules", "/dashboard"]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def spawn_server(args) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=args.db_url) if args.db_url else dict(os.environ)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=APP_DIR, env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{args.base_url}/docs", timeout=1)
+            return server
+        except httpx.HTTPError:
+            if server.poll() is not None:
+                sys.exit("uvicorn exited during startup")
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit("uvicorn did not start within 30s")
+
+
+def email(args, rng: random.Random) -> str:
+    return f"s{rng.randint(args.first_user, args.first_user + args.users - 1)}@example.edu"
+
+
+async def login_tokens(client: httpx.AsyncClient, args) -> list[str]:
+    rng = random.Random(args.seed)
+    emails = {email(args, rng) for _ in range(args.tokens)}
+
+    async def login(address):
+        response = await client.post("/login", json={"email": address, "password": PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    return await asyncio.gather(*(login(address) for address in emails))
+
+
+async def drive(client: httpx.AsyncClient, endpoint: str, tokens: list[str], args) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if endpoint == "/login":
+                    response = await client.post(endpoint, json={"email": email(args, rng), "password": PASSWORD})
+                else:
+                    headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+                    response = await client.get(endpoint, headers=headers)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+    }
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        tokens = await login_tokens(client, args)
+        results = {}
+        for endpoint in args.endpoints:
+            if args.warmup:
+                warm = argparse.Namespace(**{**vars(args), "duration": args.warmup})
+                await drive(client, endpoint, tokens, warm)
+            results[endpoint] = await drive(client, endpoint, tokens, args)
+            r = results[endpoint]
+            print(f"{endpoint:<20} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                  f"{r['p99_ms']:>9.2f} {r['errors']:>7}")
+        return results
+
+
+def load_baseline(path: str) -> dict | None:
+    if path == "latest":
+        runs = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith(".json")) if os.path.isdir(RESULTS_DIR) else []
+        if not runs:
+            return None
+        path = os.path.join(RESULTS_DIR, runs[-1])
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change per endpoint; True if anything regressed"""
+    print(f"\nvs {baseline['commit']} ({baseline['timestamp']}):")
+    regressed = False
+    for endpoint, now in current["results"].items():
+        before = baseline["results"].get(endpoint)
+        if not before or not before["p95_ms"] or not before["rps"]:
+            continue
+        p95 = now["p95_ms"] / before["p95_ms"] - 1
+        rps = now["rps"] / before["rps"] - 1
+        flag = p95 > tolerance or rps < -tolerance
+        regressed = regressed or flag
+        print(f"  {endpoint:<20} p95 {p95:+7.1%}  rps {rps:+7.1%}{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="server to test (default: http://127.0.0.1:<port>)")
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn for the run")
+    parser.add_argument("--db-url", help="DATABASE_URL for the spawned server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--users", type=int, default=10_000, help="students loaded by generate_data.py")
+    parser.add_argument("--first-user", type=int, default=1)
+    parser.add_argument("--tokens", type=int, default=50, help="distinct logged-in users for the GET endpoints")
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per endpoint")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--label", default="", help="free-form note stored with the results")
+    parser.add_argument("--baseline", help='earlier results file, or "latest"')
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+    args.base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    server = spawn_server(args) if args.spawn else None
+    try:
+        print(f"{'endpoint':<20} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        results = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "commit": git_commit(),
+        "timestamp": now.isoformat(timespec="seconds"),
+        "label": args.label,
+        "config": {key: getattr(args, key) for key in
+                   ("users", "tokens", "concurrency", "duration", "workers", "db_url", "base_url")},
+        "results": results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{now:%Y%m%dT%H%M%S}_{report['commit']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {os.path.relpath(path)}")
+
+    if baseline is not None and compare(report, baseline, args.tolerance) and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
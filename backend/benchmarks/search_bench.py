@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Time /search queries (exact, prefix and fuzzy) against the FTS5 index on a
+synthetic SQLite directory of students and courses.
+
+    python benchmarks/search_bench.py --users 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import User, Course  # noqa: E402
+import search  # noqa: E402
+from generate_data import FIRST_NAMES, LAST_NAMES, build_catalogue, full_name  # noqa: E402
+
+QUERIES = {
+    "full name": "john smith",
+    "surname": "okafor",
+    "name prefix": "pat",
+    "email": "s12345@",
+    "course code": "CS30",
+    "course name": "physics",
+    "typo (fuzzy)": "jonhson",
+}
+
+
+def populate(engine, users: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(1, users + 1, 50_000):
+            conn.execute(insert(User), [
+                {"id": i, "email": f"s{i}@example.edu", "full_name": full_name(rng), "hashed_password": "x"}
+                for i in range(start, min(start + 50_000, users + 1))
+            ])
+        conn.execute(insert(Course), [
+            {"code": code, "name": name} for courses in build_catalogue().values() for code, name, _, _ in courses
+        ])
+
+
+def timed(db: Session, q: str, repeat: int) -> tuple[float, int, bool]:
+    """(best ms, rows, fuzzy) for one query, falling back like the endpoint does"""
+    terms = search.search_terms(q)
+    best, rows, fuzzy = float("inf"), [], False
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = db.execute(search.search("sqlite", terms)).all()
+        fuzzy = not rows
+        if fuzzy:
+            rows = db.execute(search.search("sqlite", terms, fuzzy=True)).all()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, len(rows), fuzzy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        populate(engine, args.users, args.seed)
+        print(f"Indexed {args.users:,} students ({len(FIRST_NAMES)} x {len(LAST_NAMES)} names) "
+              f"in {time.perf_counter() - started:.1f}s\n")
+        print(f"{'query':<14} {'q':<12} {'best ms':>9} {'rows':>5}")
+        with Session(engine) as db:
+            for label, q in QUERIES.items():
+                ms, rows, fuzzy = timed(db, q, args.repeat)
+                print(f"{label:<14} {q:<12} {ms:>9.2f} {rows:>5}{'  (fuzzy)' if fuzzy else ''}")
+
+
+if __name__ == "__main__":
+    main()
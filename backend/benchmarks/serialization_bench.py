@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: the default list-endpoint serialization path versus the
+FAST_RESPONSES path, for 10, 1k and 100k grade rows.
+
+  default: ORM objects -> List[GradeOut] validation -> jsonable_encoder -> json
+  fast:    column tuples -> dicts -> serialization.dumps (orjson if installed)
+
+    python benchmarks/serialization_bench.py --sizes 10 1000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import User, Grade, Term, Course  # noqa: E402
+from schemas import GradeOut  # noqa: E402
+import catalog  # noqa: E402
+import queries  # noqa: E402
+import serialization  # noqa: E402
+
+GRADE_LIST = TypeAdapter(List[GradeOut])
+
+
+def default_path(db: Session) -> bytes:
+    rows = db.execute(queries.grades_for(1, columns=queries.GRADE_COLUMNS)).all()
+    validated = GRADE_LIST.validate_python(rows, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_path(db: Session) -> bytes:
+    rows = db.execute(queries.grades_for(1, columns=queries.GRADE_COLUMNS)).all()
+    keys = serialization.output_keys(GradeOut)
+    return serialization.dumps([dict(zip(keys, row)) for row in rows])
+
+
+def best_of(func, db: Session, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        func(db)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoder = "orjson" if serialization.orjson is not None else "json (orjson not installed)"
+    print(f"fast path encoder: {encoder}\n")
+    print(f"{'rows':>8}  {'default ms':>11}  {'fast ms':>9}  {'speedup':>7}")
+    for size in args.sizes:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [{"id": 1, "email": "s@example.edu", "hashed_password": "x"}])
+            conn.execute(insert(Term), [catalog.new_term("2024-2025", "Fall 2024")])
+            conn.execute(insert(Course), [{"id": n, "code": f"C{n:03d}", "name": f"Course {n}"} for n in range(90)])
+            conn.execute(insert(Grade), [
+                {"student_id": 1, "course_id": i % 90, "grade_letter": "B+", "grade_points": 3.3,
+                 "credits": 3, "term_id": 202410}
+                for i in range(size)
+            ])
+        with Session(engine) as db:
+            assert len(default_path(db)) > 0 and len(fast_path(db)) > 0
+            default = best_of(default_path, db, args.repeat)
+            fast = best_of(fast_path, db, args.repeat)
+        print(f"{size:>8}  {default * 1000:>11.2f}  {fast * 1000:>9.2f}  {default / fast:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the API workers.
+
+  import:  fresh interpreter running `import main` (wall time), plus the
+           slowest modules from `python -X importtime`
+  uvicorn: `uvicorn main:app --workers N` from launch until every worker has
+           logged "Application startup complete", and until the first 200
+
+    python benchmarks/startup_bench.py --workers 4 --repeat 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def import_seconds(app_dir: str, env) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=app_dir, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def slowest_imports(app_dir: str, env, top: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) for the top-level imports of main"""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=app_dir, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    parsed = [re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line) for line in err.splitlines()]
+    parsed = [(int(m.group(1)), len(m.group(2)), m.group(3)) for m in parsed if m]
+    # importtime lists children before their parent: walk back from main
+    main_at = max(i for i, (_, _, name) in enumerate(parsed) if name == "main")
+    depth = parsed[main_at][1]
+    rows = [(parsed[main_at][0], "main (total)")]
+    for micros, indent, name in reversed(parsed[:main_at]):
+        if indent <= depth:
+            break
+        if indent == depth + 2:
+            rows.append((micros, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def uvicorn_seconds(app_dir: str, env, workers: int, port: int) -> tuple[float, float]:
+    """(first 200, all workers started) in seconds since launch"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "info"],
+        cwd=app_dir, env=env, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True
+    )
+    all_ready = threading.Event()
+    ready_at = []
+
+    def watch_log():
+        ready = 0
+        for line in server.stderr:
+            if "Application startup complete" in line:
+                ready += 1
+                if ready == workers:
+                    ready_at.append(time.perf_counter() - started)
+                    all_ready.set()
+
+    threading.Thread(target=watch_log, daemon=True).start()
+    first_response = None
+    try:
+        while first_response is None and time.perf_counter() - started < 60:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5).status_code == 200:
+                    first_response = time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        if first_response is None or not all_ready.wait(60):
+            raise RuntimeError("uvicorn did not start within 60s")
+        return first_response, ready_at[0]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--db-url", help="DATABASE_URL for the workers")
+    parser.add_argument("--app-dir", default=APP_DIR, help="app checkout to measure (e.g. an older commit)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    if args.db_url:
+        env["DATABASE_URL"] = args.db_url
+
+    imports = [import_seconds(args.app_dir, env) for _ in range(args.repeat)]
+    print(f"import main:        median {statistics.median(imports) * 1000:7.1f} ms   "
+          f"min {min(imports) * 1000:7.1f} ms")
+    for micros, module in slowest_imports(args.app_dir, env, args.top):
+        print(f"    {micros / 1000:8.1f} ms  {module}")
+
+    runs = [uvicorn_seconds(args.app_dir, env, args.workers, args.port) for _ in range(args.repeat)]
+    first, ready = zip(*runs)
+    print(f"\nuvicorn --workers {args.workers}:")
+    print(f"  first response:   median {statistics.median(first) * 1000:7.1f} ms   min {min(first) * 1000:7.1f} ms")
+    print(f"  all workers up:   median {statistics.median(ready) * 1000:7.1f} ms   min {min(ready) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Read endpoints stay within their SQL statement budgets (metrics.QUERY_BUDGETS).
+
+Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# before the app is imported: settings are read at import time
+_tmp = tempfile.mkdtemp(prefix="college-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/college.db",
+    "DB_CREATE_ALL": "1",
+    "STRICT_QUERY_BUDGETS": "1",
+    "METRICS_ENABLED": "1",
+    "BCRYPT_ROUNDS": "4",
+    "JOB_OUTPUT_DIR": f"{_tmp}/job_output",
+})
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+import metrics  # noqa: E402
+
+TERMS = [("2023-2024", "Spring 2024"), ("2024-2025", "Fall 2024")]
+READ_ENDPOINTS = [
+    "/me", "/grades", "/academic-records", "/class-schedules",
+    "/academic-summary", "/grade-summary", "/gpa", "/dashboard",
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        client.post("/register", json={"email": "budget@example.edu", "password": "pw", "full_name": "B"})
+        token = client.post("/login", json={"email": "budget@example.edu", "password": "pw"}).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        for year, semester in TERMS:
+            client.post("/academic-records", json={
+                "academic_year": year, "semester": semester, "gpa": 3.5, "total_credits": 15
+            }).raise_for_status()
+            for n in range(5):
+                client.post("/grades", json={
+                    "course_code": f"C{n}", "course_name": f"Course {n}", "grade_letter": "B",
+                    "grade_points": 3.0, "credits": 3, "academic_year": year, "semester": semester
+                }).raise_for_status()
+                client.post("/class-schedules", json={
+                    "course_code": f"C{n}", "course_name": f"Course {n}", "day_of_week": "Monday",
+                    "start_time": f"{9 + n:02d}:00", "end_time": f"{9 + n:02d}:50",
+                    "academic_year": year, "semester": semester
+                }).raise_for_status()
+        yield client
+
+
+@pytest.mark.parametrize("path", READ_ENDPOINTS)
+def test_read_endpoint_within_budget(client, path):
+    # STRICT_QUERY_BUDGETS makes the middleware raise QueryBudgetExceeded
+    assert client.get(path).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/grades", "/academic-records", "/class-schedules"])
+def test_paged_list_within_budget(client, path):
+    first = client.get(path, params={"limit": 1})
+    assert first.status_code == 200
+    cursor = first.headers.get("X-Next-Cursor")
+    assert cursor
+    assert client.get(path, params={"limit": 1, "cursor": cursor}).status_code == 200
+
+
+def test_dashboard_sections_within_budget(client):
+    response = client.get("/dashboard", params={"sections": "academic_summary,grade_summary,grades"})
+    assert response.status_code == 200
+
+
+def test_budget_violation_raises():
+    stats = metrics.RequestStats()
+    stats.sql_count = metrics.QUERY_BUDGETS[("GET", "/grades")] + 1
+    with pytest.raises(metrics.QueryBudgetExceeded):
+        metrics.check_budget("GET", "/grades", stats)